@@ -7,8 +7,11 @@
 
 import os
 import sys
+import time
 import importlib
+import importlib.util
 import logging
+import threading
 from typing import Dict, Any
 
 import folder_paths
@@ -27,53 +30,215 @@ sys.path.append(modules_path)
 NODE_CLASS_MAPPINGS: Dict[str, Any] = {}
 NODE_DISPLAY_NAME_MAPPINGS: Dict[str, str] = {}
 
-# Module configuration
-NODE_MODULES = [
-    "random_prompt_generator",
-    "text_appender",
-    #"model_save",
-    "model_analyser",
-    "flux_quant",
-    #"arc_lr_scheduler",
-    "groq_node",
-]
+# Module configuration: node id -> (class name, display name), plus the
+# top-level packages each module needs. Nothing here is imported until a
+# node is first used, so startup only pays for a find_spec per dependency.
+# Keep it in step with each module's NODE_CLASS_MAPPINGS and
+# NODE_DISPLAY_NAME_MAPPINGS; benchmarks/check_node_registry.py compares them,
+# and a mismatch is logged when a module is first imported.
+NODE_MODULES = {
+    "random_prompt_generator": {
+        "requires": [],
+        "nodes": {"IntegratedRandomPromptGenerator": ("DictionaryPromptGenerator", "Prompt Generator (Dictionary)")},
+    },
+    "text_appender": {
+        "requires": ["folder_paths"],
+        "nodes": {"TextAppender_v2": ("TextAppender", "Text Appender")},
+    },
+    #"model_save": {
+    #    "requires": ["torch", "safetensors", "folder_paths"],
+    #    "nodes": {"FluxModelSave_v2": ("ModelSave_v2", "Save Flux Model v2")},
+    #},
+    "model_analyser": {
+        "requires": ["torch"],
+        "nodes": {"ModelAnalyserNode": ("ModelAnalyserNode", "Model Analyser")},
+    },
+    "flux_quant": {
+        "requires": ["torch", "safetensors", "folder_paths"],
+        "nodes": {"FluxQuantNode": ("FluxQuantNode", "Flux Quant Node")},
+    },
+    "arc_lr_scheduler": {
+        "requires": ["torch", "comfy"],
+        "nodes": {"GODARCScheduler": ("GODARCScheduler", "GOD ARC Scheduler")},
+    },
+    "ckpt_converter": {
+        "requires": ["folder_paths"],
+        "nodes": {"CkptToSafetensorsNode": ("CkptToSafetensorsNode", "Convert Checkpoint to Safetensors")},
+    },
+    "groq_node": {
+        "requires": ["groq", "httpx"],
+        "nodes": {
+            "GroqAPIPromptEnhancer": ("GroqAPIPromptEnhancer", "Groq API Prompt Enhancer"),
+            "GroqAPIBatchPromptEnhancer": ("GroqAPIBatchPromptEnhancer", "Groq API Batch Prompt Enhancer"),
+        },
+    },
+}
+
+_import_lock = threading.Lock()
+_import_times: Dict[str, float] = {}
+_missing_dependencies: Dict[str, list] = {}
+
+
+class MissingDependency(RuntimeError):
+    """A node module needs packages that are not installed."""
+
+    def __init__(self, module_name: str, missing: list[str]):
+        super().__init__(f"Switchblade module {module_name} is disabled, missing dependency: {', '.join(missing)} "
+                         f"(install with: pip install {' '.join(missing)})")
+        self.missing = missing
+
+
+def disable_module(module_name: str, missing: list[str], note: str = "") -> MissingDependency:
+    """Record and log a module whose dependencies are missing; its nodes become stand-ins."""
+    _missing_dependencies[module_name] = missing
+    error = MissingDependency(module_name, missing)
+    logger.warning(f"Switchblade: {', '.join(NODE_MODULES[module_name]['nodes'])} disabled, "
+                   f"missing dependency: {', '.join(missing)} (install with: pip install {' '.join(missing)}){note}")
+    return error
+
+
+def import_node_module(module_name: str):
+    """Import a node module on first use and log how long it took."""
+    with _import_lock:
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+        if module_name in _missing_dependencies:
+            raise MissingDependency(module_name, _missing_dependencies[module_name])
+        start = time.perf_counter()
+        try:
+            module = importlib.import_module(module_name, package=__name__)
+        except ModuleNotFoundError as e:
+            missing = (e.name or "").split(".")[0]
+            if missing and missing != module_name:
+                # Undeclared dependency: handled like one caught by missing_requirements
+                error = disable_module(module_name, [missing], f"; add it to requires for {module_name}")
+                write_nodes_list(list(NODE_MODULES))
+                raise error from e
+            logger.error(f"Error loading module {module_name}: {e}")
+            raise RuntimeError(f"Switchblade module {module_name} could not be loaded: {e}") from e
+        except ImportError as e:
+            logger.error(f"Error loading module {module_name}: {e}")
+            raise RuntimeError(f"Switchblade module {module_name} could not be loaded: {e}") from e
+        _import_times[module_name] = time.perf_counter() - start
+        logger.info(f"Loaded module: {module_name} in {_import_times[module_name] * 1000:.1f} ms")
+        for problem in check_declarations(module_name, module):
+            logger.error(f"Switchblade: NODE_MODULES out of date: {problem}")
+        return module
+
+
+def check_declarations(module_name: str, module) -> list[str]:
+    """Compare a module's own node mappings with its NODE_MODULES declaration."""
+    declared = NODE_MODULES[module_name]["nodes"]
+    classes = getattr(module, "NODE_CLASS_MAPPINGS", {})
+    names = getattr(module, "NODE_DISPLAY_NAME_MAPPINGS", {})
+    problems = []
+    for identifier in sorted(set(declared) ^ set(classes)):
+        where = "declared but not in" if identifier in declared else "missing from NODE_MODULES, defined in"
+        problems.append(f"{identifier} {where} {module_name}.NODE_CLASS_MAPPINGS")
+    for identifier, (class_name, display_name) in declared.items():
+        if identifier not in classes:
+            continue
+        if classes[identifier].__name__ != class_name:
+            problems.append(f"{identifier} declared as class {class_name}, module maps it to {classes[identifier].__name__}")
+        if names.get(identifier, display_name) != display_name:
+            problems.append(f"{identifier} declared as \"{display_name}\", module names it \"{names[identifier]}\"")
+    return problems
+
+
+def make_unavailable_node(class_name: str, error: MissingDependency) -> type:
+    """Stand-in for a node whose module's dependencies are missing.
+
+    Saved workflows still find the node id and show the install hint as its
+    description; running it fails with the same message.
+    """
+    message = str(error)
+
+    def unavailable(self, **kwargs):
+        raise RuntimeError(message)
+
+    return type(class_name, (), {
+        "INPUT_TYPES": classmethod(lambda cls: {"required": {}}),
+        "RETURN_TYPES": (),
+        "FUNCTION": "unavailable",
+        "CATEGORY": "MilitantAI/Switchblade/Unavailable",
+        "DESCRIPTION": message,
+        "unavailable": unavailable,
+    })
+
+
+class LazyNode(type):
+    """Metaclass for node proxies that import the real node class on first use.
+
+    ComfyUI only reads class attributes (INPUT_TYPES, RETURN_TYPES, FUNCTION, ...)
+    and instantiates the class, so both are forwarded to the real class.
+    """
+
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(cls.resolve(), name)
+
+    def __call__(cls, *args, **kwargs):
+        return cls.resolve()(*args, **kwargs)
+
+    def resolve(cls):
+        real = cls.__dict__.get("_real")
+        if real is None:
+            try:
+                real = getattr(import_node_module(cls._module_name), cls._class_name)
+            except MissingDependency as e:
+                real = make_unavailable_node(cls._class_name, e)
+            type.__setattr__(cls, "_real", real)
+        return real
+
+
+def make_lazy_node(module_name: str, class_name: str) -> Any:
+    return LazyNode(class_name, (), {"_module_name": module_name, "_class_name": class_name, "_real": None})
+
+
+def missing_requirements(requires: list[str]) -> list[str]:
+    return [name for name in requires if name not in sys.modules and importlib.util.find_spec(name) is None]
+
 
 def load_nodes(module_name: str) -> None:
-    """Load node classes and display names from a module."""
-    try:
-        module = importlib.import_module(module_name, package=__name__)
-        NODE_CLASS_MAPPINGS.update(module.NODE_CLASS_MAPPINGS)
-        NODE_DISPLAY_NAME_MAPPINGS.update(module.NODE_DISPLAY_NAME_MAPPINGS)
-        logger.info(f"Loaded module: {module_name}")
-    except ImportError as e:
-        logger.error(f"Error loading module {module_name}: {e}")
+    """Register lazy proxies for a module's nodes, or stand-ins if a dependency is missing."""
+    spec = NODE_MODULES[module_name]
+    missing = missing_requirements(spec["requires"])
+    error = disable_module(module_name, missing) if missing else None
+    for identifier, (class_name, display_name) in spec["nodes"].items():
+        if error is None:
+            NODE_CLASS_MAPPINGS[identifier] = make_lazy_node(module_name, class_name)
+        else:
+            NODE_CLASS_MAPPINGS[identifier] = make_unavailable_node(class_name, error)
+        NODE_DISPLAY_NAME_MAPPINGS[identifier] = display_name
 
 def write_nodes_list(module_names: list[str]) -> None:
-    """Write the list of loaded nodes to a log file."""
+    """Write the list of registered nodes to a log file."""
     this_dir = os.path.dirname(os.path.abspath(__file__))
     path = os.path.join(this_dir, "nodes.log")
     lines = []
     for module_name in module_names:
-        try:
-            module = importlib.import_module(module_name, package=__name__)
-            lines.append(module_name.strip("."))
-            for identifier, display_name in module.NODE_DISPLAY_NAME_MAPPINGS.items():
-                lines.append(f" {identifier}: {display_name}")
-            lines.append("")
-        except ImportError as e:
-            lines.append(f"Error loading {module_name}: {e}")
-    
+        lines.append(module_name.strip("."))
+        status = ""
+        if module_name in _missing_dependencies:
+            status = f" (disabled, missing dependency: {', '.join(_missing_dependencies[module_name])})"
+        for identifier, (_, display_name) in NODE_MODULES[module_name]["nodes"].items():
+            lines.append(f" {identifier}: {display_name}{status}")
+        lines.append("")
+
     with open(path, "w", encoding="utf8") as f:
         f.write("\n".join(lines))
 
 def initialize_switchblade() -> None:
     """Initialize the Switchblade Pack."""
     logger.info("Loading: Militant Hitchhiker's Switchblade Pack (Switchblade v1.3)")
-    
+    start = time.perf_counter()
+
     for module_name in NODE_MODULES:
         load_nodes(module_name)
-    
-    write_nodes_list(NODE_MODULES)
+
+    write_nodes_list(list(NODE_MODULES))
+    logger.info(f"Registered {len(NODE_CLASS_MAPPINGS)} Switchblade nodes in {(time.perf_counter() - start) * 1000:.1f} ms")
 
 # Initialize the pack
 initialize_switchblade()
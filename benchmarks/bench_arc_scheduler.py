@@ -0,0 +1,76 @@
+"""Benchmark the vectorised GOD ARC schedule against the original per-step loop.
+
+Run from the repository root:
+    python benchmarks/bench_arc_scheduler.py
+"""
+
+import math
+import os
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "modules"))
+
+from arc_lr_scheduler import GODARCScheduler
+
+SIGMA_MIN = 0.0291675
+SIGMA_MAX = 14.614642
+
+
+def karras_sigmas(steps, sigma_min=SIGMA_MIN, sigma_max=SIGMA_MAX, rho=7.0):
+    """Same schedule comfy's "karras" produces, including the terminal zero."""
+    ramp = torch.linspace(0, 1, steps)
+    min_inv_rho = sigma_min ** (1 / rho)
+    max_inv_rho = sigma_max ** (1 / rho)
+    sigmas = (max_inv_rho + ramp * (min_inv_rho - max_inv_rho)) ** rho
+    return torch.cat([sigmas, sigmas.new_zeros([1])])
+
+
+def legacy_apply_arc(base_sigmas, sigma_min, sigma_max, gravity_strength, recursive_depth):
+    """The original Python loop, kept here as the reference."""
+    def gravity_fn(progress, strength):
+        return 1 / (1 + math.exp(-strength * progress))
+
+    def recursive_adjustment(sigma, depth, progress, strength):
+        if depth == 0:
+            return sigma
+        return recursive_adjustment(gravity_fn(progress, strength) * sigma, depth - 1, progress, strength)
+
+    adjusted_sigmas = []
+    steps = len(base_sigmas)
+    for i, sigma in enumerate(base_sigmas):
+        progress = i / (steps - 1)
+        adjusted_sigma = recursive_adjustment(sigma, recursive_depth, progress, gravity_strength)
+        adjusted_sigmas.append(max(sigma_min, min(adjusted_sigma, sigma_max)))
+    return torch.tensor(adjusted_sigmas)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    scheduler = GODARCScheduler()
+    strength, depth = 1.0, 3
+    print(f"{'steps':>6} {'legacy ms':>10} {'vector ms':>10} {'speedup':>8} {'max diff':>10}")
+    for steps in (20, 100, 1000, 10000):
+        base = karras_sigmas(steps)
+        repeat = 3 if steps >= 1000 else 10
+        legacy_s, legacy = timed(lambda: legacy_apply_arc(base, SIGMA_MIN, SIGMA_MAX, strength, depth), repeat)
+        vector_s, vector = timed(lambda: scheduler.apply_arc_to_sigmas(base, SIGMA_MIN, SIGMA_MAX, strength, depth), repeat * 10)
+        assert vector[-1] == 0, "terminal sigma must stay zero"
+        assert bool((vector[1:] <= vector[:-1]).all()), "schedule must be non-increasing"
+        # The legacy loop clamps the terminal zero up to sigma_min, so compare the rest
+        diff = (legacy[:-1] - vector[:-1]).abs().max().item()
+        print(f"{steps:>6} {legacy_s * 1000:>10.3f} {vector_s * 1000:>10.3f} {legacy_s / vector_s:>7.0f}x {diff:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Check Groq batching against the local stub server: order, retries and rate limits.
+
+    python benchmarks/check_groq_batch.py
+    python benchmarks/check_groq_batch.py --prompts 200 --rate-limit-ratio 0.5 --concurrency 32
+
+Runs the batch twice, once without a tokens-per-minute limit and once with
+--tokens-per-minute. Exits with status 1 when results come back out of input
+order, when a 429 was not retried to success, when the requests- or
+tokens-per-minute limit is exceeded, or when the token budget runs slower
+than the tokens actually used allow (for example because rejected attempts
+were charged against it).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+
+def setup_paths():
+    for path in (os.path.join(REPO_DIR, "modules"), os.path.join(BENCH_DIR, "stubs")):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def check(args, tokens_per_minute=0):
+    """Return (report, failures) for one batch run."""
+    setup_paths()
+    from groq_batch import BatchEnhancer
+    from groq_stub_server import GroqStubServer
+
+    server = GroqStubServer(latency=args.latency, rate_limit_ratio=args.rate_limit_ratio,
+                            rate_limit_attempts=args.rate_limit_attempts, retry_after=args.retry_after).start()
+    try:
+        prompts = [f"prompt {i:04d}" for i in range(args.prompts)] + ["prompt [empty]"]
+        enhancer = BatchEnhancer(
+            "stub-key", "llama-3.1-8b-instant", concurrency=args.concurrency,
+            requests_per_minute=args.requests_per_minute, tokens_per_minute=tokens_per_minute,
+            max_retries=args.rate_limit_attempts + 1, base_url=server.base_url,
+        )
+        start = time.perf_counter()
+        results = enhancer.run(prompts)
+        elapsed = time.perf_counter() - start
+        stats = server.snapshot()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    failures = []
+    expected = [f"enhanced: {p}" for p in prompts[:-1]] + [""]
+    out_of_order = [i for i, (r, e) in enumerate(zip(results, expected)) if r != e]
+    if len(results) != len(prompts) or out_of_order:
+        failures.append(f"{len(out_of_order)} results differ from their prompts, first at index {out_of_order[:1]}")
+    if args.rate_limit_ratio > 0 and stats["rate_limited"] == 0:
+        failures.append("no prompt was rate limited; raise --rate-limit-ratio or --prompts")
+    if stats["requests"] != len(prompts) + stats["rate_limited"]:
+        failures.append(f"{stats['requests']} requests for {len(prompts)} prompts and {stats['rate_limited']} 429s")
+    if args.requests_per_minute:
+        # The bucket starts full, so only requests beyond the first minute's allowance are paced
+        allowed = args.requests_per_minute * (1 + elapsed / 60.0)
+        if stats["requests"] > allowed:
+            failures.append(f"{stats['requests']} requests in {elapsed:.1f} s exceeds {args.requests_per_minute} rpm")
+    if tokens_per_minute:
+        if stats["tokens"] > tokens_per_minute * (1 + elapsed / 60.0):
+            failures.append(f"{stats['tokens']} tokens in {elapsed:.1f} s exceeds {tokens_per_minute} tpm")
+        # Beyond the full starting bucket, the tokens used need this long at the configured rate
+        paced = max(0, stats["tokens"] - tokens_per_minute) / tokens_per_minute * 60.0
+        if elapsed > paced + args.slack:
+            failures.append(f"took {elapsed:.1f} s, but the {stats['tokens']} tokens used fit in {paced:.1f} s "
+                            f"at {tokens_per_minute} tpm; the token budget is being drained")
+
+    report = {
+        "tokens_per_minute": tokens_per_minute,
+        "prompts": len(prompts),
+        "requests": stats["requests"],
+        "rate_limited": stats["rate_limited"],
+        "tokens": stats["tokens"],
+        "elapsed_s": elapsed,
+        "prompts_per_s": len(prompts) / elapsed if elapsed > 0 else None,
+    }
+    return report, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prompts", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests-per-minute", type=int, default=0)
+    parser.add_argument("--tokens-per-minute", type=int, default=6000, help="limit for the second run")
+    parser.add_argument("--slack", type=float, default=10.0, help="seconds of retry backoff allowed in the TPM run")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.3)
+    parser.add_argument("--rate-limit-attempts", type=int, default=2)
+    parser.add_argument("--retry-after", type=float, default=0.05)
+    args = parser.parse_args()
+
+    failures = []
+    for tokens_per_minute in (0, args.tokens_per_minute):
+        report, run_failures = check(args, tokens_per_minute)
+        print(json.dumps(report, indent=2))
+        failures.extend(f"tpm={tokens_per_minute}: {failure}" for failure in run_failures)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Check that NODE_MODULES in __init__.py matches what each node module defines.
+
+    python benchmarks/check_node_registry.py
+
+Loads the pack against the stubs in benchmarks/stubs, resolves every lazy
+node, and exits with status 1 when a declared node id, class name or
+display name disagrees with the module's own mappings, or a node module
+fails to import for a reason other than an uninstalled optional dependency.
+"""
+
+import importlib.util
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+
+def load_pack():
+    stubs = os.path.join(BENCH_DIR, "stubs")
+    if stubs not in sys.path:
+        sys.path.insert(0, stubs)
+    spec = importlib.util.spec_from_file_location(
+        "switchblade", os.path.join(REPO_DIR, "__init__.py"), submodule_search_locations=[REPO_DIR]
+    )
+    pack = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = pack
+    spec.loader.exec_module(pack)
+    return pack
+
+
+def check(pack):
+    """Return (problems, skipped modules)."""
+    problems = []
+    skipped = dict(pack._missing_dependencies)
+    for module_name in pack.NODE_MODULES:
+        if module_name in skipped:
+            continue
+        try:
+            module = pack.import_node_module(module_name)
+        except pack.MissingDependency as e:
+            skipped[module_name] = e.missing
+            continue
+        except RuntimeError as e:
+            problems.append(str(e))
+            continue
+        problems.extend(pack.check_declarations(module_name, module))
+    for identifier in pack.NODE_CLASS_MAPPINGS:
+        if identifier not in pack.NODE_DISPLAY_NAME_MAPPINGS:
+            problems.append(f"{identifier} is registered without a display name")
+    return problems, skipped
+
+
+def main():
+    pack = load_pack()
+    problems, skipped = check(pack)
+    for module_name, missing in skipped.items():
+        print(f"skipped {module_name}: missing {', '.join(missing)}")
+    for problem in problems:
+        print(f"FAIL {problem}", file=sys.stderr)
+    if not problems:
+        print(f"{len(pack.NODE_MODULES) - len(skipped)} node modules match their declarations")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
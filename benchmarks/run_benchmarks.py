@@ -0,0 +1,322 @@
+"""Reproducible benchmark suite for the Switchblade nodes.
+
+Every case runs in its own subprocess so peak RSS is measured per case.
+ComfyUI is replaced by the stand-ins in benchmarks/stubs and models by
+synthetic Flux state dicts.
+
+    python benchmarks/run_benchmarks.py                        # run, print JSON
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+
+--compare exits with status 1 when a case loses more than --tolerance of its
+throughput or grows its peak RSS by more than --tolerance, and refuses to
+compare against a baseline recorded with different workload settings. A case
+fails outright when its node returns an error or does not write its output.
+"""
+
+import argparse
+import contextlib
+import importlib.metadata
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    # Windows: peak working set via psutil instead, if it is installed
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+# Settings that change the work a case does; reports are only comparable when they match
+WORKLOAD_SETTINGS = ("scale", "repeat", "prompt_calls", "append_calls", "dictionary_size")
+
+CASES = [
+    "model_analyser.analyse_model",
+    "flux_quant.analyse_and_save_model",
+    "model_save.save_flux_model",
+    "random_prompt_generator.generate",
+    "text_appender.append_text",
+    "text_appender.append_text_jsonl",
+]
+
+
+def setup_paths():
+    # Stubs go first so they shadow any real ComfyUI on the path
+    for path in (os.path.join(REPO_DIR, "modules"), BENCH_DIR, os.path.join(BENCH_DIR, "stubs")):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def rss_mb():
+    """Peak RSS of this (per-case) process so far, or None where it cannot be read."""
+    if resource is not None:
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    return None
+
+
+def time_call(fn, repeat):
+    """Return the timings and the last call's result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        # The nodes report progress with print(); keep it out of the results stream
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def output_error(result):
+    """The nodes report failures as an error string in their first output instead of raising."""
+    text = result[0] if isinstance(result, tuple) and result else result
+    if isinstance(text, str) and text.startswith("Error"):
+        return text
+    return None
+
+
+def missing_files(workdir, *names):
+    missing = [name for name in names if not os.path.exists(os.path.join(workdir, name))]
+    return f"expected output missing: {', '.join(missing)}" if missing else None
+
+
+def prepare_case(name, args, workdir):
+    """Return (callable, work units per call, unit, check) for a case.
+
+    check(result) runs after timing and returns an error message when the
+    node failed, so a broken node cannot pass as a faster one.
+    """
+    import folder_paths
+    folder_paths.set_output_directory(workdir)
+
+    if name.split(".")[0] in ("model_analyser", "flux_quant", "model_save"):
+        import torch
+        from synthetic_flux import SyntheticModel, make_flux_state_dict, state_dict_bytes
+        state_dict = make_flux_state_dict(scale=args.scale, dtype=torch.bfloat16)
+        model = SyntheticModel(state_dict)
+        size_mb = state_dict_bytes(state_dict) / (1024 ** 2)
+
+        if name == "model_analyser.analyse_model":
+            from model_analyser import ModelAnalyserNode
+            node = ModelAnalyserNode()
+
+            def check(result):
+                try:
+                    json.loads(result[0])["structure"]
+                except (ValueError, KeyError, TypeError):
+                    return f"analysis is not valid JSON: {str(result[0])[:200]}"
+                return None
+            return (lambda: node.analyse_model(model)), size_mb, "MB/s", check
+        if name == "flux_quant.analyse_and_save_model":
+            from flux_quant import FluxQuantNode
+            node = FluxQuantNode()
+
+            def check(result):
+                # The node picks the file name from the model and the precision it settled on
+                return output_error(result) or (None if any(f.endswith(".safetensors") for f in os.listdir(workdir))
+                                                else "expected output missing: *.safetensors")
+            return (lambda: node.analyse_and_save_model(model, "float16")), size_mb, "MB/s", check
+        from model_save import ModelSave_v2
+        node = ModelSave_v2()
+        return ((lambda: node.save_flux_model(model, "bench_flux", "bfloat16")), size_mb, "MB/s",
+                lambda result: missing_files(workdir, "bench_flux.safetensors", "bench_flux_info.json"))
+
+    if name == "random_prompt_generator.generate":
+        import random
+        from random_prompt_generator import DictionaryPromptGenerator
+        dictionaries = os.path.join(workdir, "Dictionaries")
+        os.makedirs(dictionaries, exist_ok=True)
+        rng = random.Random(0)
+        for i in range(4):
+            words = [f"word{i}_{rng.randrange(10 ** 6)}" for _ in range(args.dictionary_size)]
+            with open(os.path.join(dictionaries, f"dict{i}.txt"), "w", encoding="utf-8") as f:
+                f.write(";".join(words))
+
+        class BenchGenerator(DictionaryPromptGenerator):
+            @staticmethod
+            def get_dictionaries_folder():
+                return dictionaries
+
+        node = BenchGenerator()
+        calls = args.prompt_calls
+
+        def run():
+            for seed in range(calls):
+                result = node.generate("dict0.txt", "dict1.txt", "dict2.txt", "dict3.txt", True, True, True, True,
+                                       ";", ";", ";", ";", ", ", seed)
+            return result
+
+        def check(result):
+            # One word from each of the four dictionaries
+            if len(result[0].split(", ")) != 4:
+                return f"unexpected prompt: {result[0]!r}"
+            return None
+        return run, calls, "prompts/s", check
+
+    if name.startswith("text_appender."):
+        from text_appender import TextAppender
+        node = TextAppender()
+        calls = args.append_calls
+        mode = "jsonl" if name.endswith("_jsonl") else "text"
+        text = "a highly detailed photograph of a lighthouse at dusk, volumetric light"
+
+        def run():
+            for i in range(calls):
+                result = node.append_text(text1=text, text2=f"seed {i}", output_file="bench_append.txt",
+                                          output_mode=mode, seed=i, rotate_max_mb=64.0)
+            return result
+
+        def check(result):
+            output = "bench_append.txt.jsonl" if mode == "jsonl" else "bench_append.txt"
+            return output_error(result) or missing_files(workdir, output)
+        return run, calls, "records/s", check
+
+    raise ValueError(f"unknown case {name}")
+
+
+def run_case(name, args):
+    """Runs in the child process; prints one JSON object."""
+    setup_paths()
+    workdir = tempfile.mkdtemp(prefix="switchblade_bench_")
+    try:
+        fn, units, unit, check = prepare_case(name, args, workdir)
+        rss_setup = rss_mb()
+        timings, result = time_call(fn, args.repeat)
+        rss_peak = rss_mb()
+        error = check(result)
+        if error:
+            raise RuntimeError(f"{name} failed: {error}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    best = min(timings)
+    return {
+        "best_s": best,
+        "mean_s": sum(timings) / len(timings),
+        "throughput": units / best if best > 0 else None,
+        "unit": unit,
+        "peak_rss_mb": rss_peak,
+        "rss_delta_mb": rss_peak - rss_setup if rss_peak is not None else None,
+    }
+
+
+def run_all(args):
+    results = {}
+    for name in args.cases:
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", name, "--scale", str(args.scale),
+               "--repeat", str(args.repeat), "--prompt-calls", str(args.prompt_calls),
+               "--append-calls", str(args.append_calls), "--dictionary-size", str(args.dictionary_size)]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            results[name] = {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+        else:
+            results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{name}: {results[name]}", file=sys.stderr)
+    return results
+
+
+def metadata(args):
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        **{key: getattr(args, key) for key in WORKLOAD_SETTINGS},
+    }
+    # Read the version without importing torch: children inherit the parent's peak RSS
+    try:
+        meta["torch"] = importlib.metadata.version("torch")
+    except importlib.metadata.PackageNotFoundError:
+        pass
+    return meta
+
+
+def compare(report, baseline, tolerance):
+    """Return a list of human-readable regressions."""
+    base_meta = baseline.get("meta", {})
+    mismatched = [f"{key} {base_meta.get(key)} (baseline) != {report['meta'][key]}"
+                  for key in WORKLOAD_SETTINGS if base_meta.get(key) != report["meta"][key]]
+    if mismatched:
+        # Throughput from a different workload says nothing about a regression
+        return ["not comparable, workload settings differ: " + "; ".join(mismatched)]
+    regressions = []
+    for name, current in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if "error" in current:
+            regressions.append(f"{name}: {current['error']}")
+            continue
+        if base is None or "error" in base:
+            continue
+        if base["throughput"] and current["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput']:.1f} {current['unit']} "
+                               f"< baseline {base['throughput']:.1f}")
+        if current["peak_rss_mb"] is None or base.get("peak_rss_mb") is None:
+            continue
+        if current["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {current['peak_rss_mb']:.0f} MB "
+                               f"> baseline {base['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", default=CASES, choices=CASES)
+    parser.add_argument("--scale", type=float, default=1.0 / 16, help="Flux hidden-size scale (1.0 = full size)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--prompt-calls", type=int, default=1000)
+    parser.add_argument("--append-calls", type=int, default=1000)
+    parser.add_argument("--dictionary-size", type=int, default=5000)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--save-baseline", help="write the report as a new baseline")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_case(args.child, args)))
+        return 0
+
+    report = {"meta": metadata(args), "results": run_all(args)}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("platform") != report["meta"]["platform"]:
+            print("warning: baseline was recorded on a different platform; timings may not be comparable", file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
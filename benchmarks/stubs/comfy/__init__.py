@@ -0,0 +1 @@
+"""Minimal stand-ins for the parts of ComfyUI's comfy package the pack uses."""
@@ -0,0 +1,13 @@
+import torch
+
+
+def calculate_sigmas(model_sampling, scheduler_name, steps):
+    """Karras schedule with a terminal zero; other schedulers are not needed by the pack."""
+    if scheduler_name != "karras":
+        raise ValueError(f"benchmark stub only implements karras, got {scheduler_name}")
+    rho = 7.0
+    ramp = torch.linspace(0, 1, steps)
+    min_inv_rho = float(model_sampling.sigma_min) ** (1 / rho)
+    max_inv_rho = float(model_sampling.sigma_max) ** (1 / rho)
+    sigmas = (max_inv_rho + ramp * (min_inv_rho - max_inv_rho)) ** rho
+    return torch.cat([sigmas, sigmas.new_zeros([1])])
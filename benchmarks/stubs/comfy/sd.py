@@ -0,0 +1,10 @@
+from synthetic_flux import SyntheticModel
+
+
+def load_diffusion_model_state_dict(sd, model_options={}):
+    """Wrap a raw state dict the way ComfyUI's ModelPatcher exposes it (model.model.state_dict())."""
+    if not sd:
+        return None
+    if not any(k.startswith("diffusion_model.") for k in sd):
+        sd = {f"diffusion_model.{k}": v for k, v in sd.items()}
+    return SyntheticModel(sd)
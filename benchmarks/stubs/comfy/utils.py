@@ -0,0 +1,11 @@
+import safetensors.torch
+import torch
+
+
+def load_torch_file(ckpt, safe_load=False, device=None):
+    if device is None:
+        device = torch.device("cpu")
+    if ckpt.lower().endswith((".safetensors", ".sft")):
+        return safetensors.torch.load_file(ckpt, device=device.type)
+    sd = torch.load(ckpt, map_location=device, weights_only=True)
+    return sd.get("state_dict", sd)
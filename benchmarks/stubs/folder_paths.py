@@ -0,0 +1,18 @@
+"""Stand-in for ComfyUI's folder_paths, used by the benchmark harness.
+
+Output goes to $SWITCHBLADE_BENCH_OUTPUT, or a fresh temporary directory.
+"""
+
+import os
+import tempfile
+
+_output_directory = os.environ.get("SWITCHBLADE_BENCH_OUTPUT") or tempfile.mkdtemp(prefix="switchblade_bench_")
+
+
+def get_output_directory():
+    return _output_directory
+
+
+def set_output_directory(path):
+    global _output_directory
+    _output_directory = path
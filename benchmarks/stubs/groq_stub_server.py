@@ -0,0 +1,179 @@
+"""Local stand-in for the Groq chat completions endpoint.
+
+Point the Groq nodes at it with "base_url" in groq_config.json (or pass
+base_url to BatchEnhancer) to exercise batching, retries and streaming
+without an API key or network access:
+
+    python benchmarks/stubs/groq_stub_server.py --port 8765 --rate-limit-ratio 0.3 --retry-after 0.1
+
+Completions echo the prompt as "enhanced: <prompt>", so callers can check
+that results come back in input order. Rate limiting is deterministic: a
+prompt is rejected with 429 on its first --rate-limit-attempts tries when
+its hash falls under --rate-limit-ratio, regardless of request order. A
+prompt containing "[empty]" gets a completion with null content.
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class GroqStubHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real API, so connection pooling can be observed
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/stats":
+            self.send_json(404, {"error": {"message": "not found"}})
+            return
+        self.send_json(200, self.server.snapshot())
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": "not found"}})
+            return
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+
+        if self.server.should_rate_limit(prompt):
+            self.send_json(429, {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                           {"retry-after": f"{self.server.retry_after:g}"})
+            return
+
+        time.sleep(self.server.latency)
+        content = None if "[empty]" in prompt else f"enhanced: {prompt}"
+        words = (content or "").split()
+        usage = {
+            "prompt_tokens": max(1, len(prompt) // 4),
+            "completion_tokens": len(words),
+            "total_tokens": max(1, len(prompt) // 4) + len(words),
+            "queue_time": 0.0,
+            "total_time": self.server.latency,
+        }
+        self.server.count_tokens(usage["total_tokens"])
+        if body.get("stream"):
+            self.send_stream(body["model"], words, usage)
+            return
+        self.send_json(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", ""),
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": usage,
+        })
+
+    def send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_stream(self, model, words, usage):
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("transfer-encoding", "chunked")
+        self.end_headers()
+
+        def send_event(data):
+            event = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(event):x}\r\n".encode("ascii") + event + b"\r\n")
+            self.wfile.flush()
+
+        chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+        try:
+            for word in words:
+                send_event(json.dumps({**chunk, "choices": [{"index": 0, "delta": {"content": word + " "}}]}))
+                time.sleep(self.server.token_interval)
+            send_event(json.dumps({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                                   "x_groq": {"usage": usage}}))
+            send_event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream early (stop sequence or token budget)
+            pass
+
+
+class GroqStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency=0.05, token_interval=0.01,
+                 rate_limit_ratio=0.0, rate_limit_attempts=1, retry_after=0.1):
+        super().__init__(address, GroqStubHandler)
+        self.latency = latency
+        self.token_interval = token_interval
+        self.rate_limit_ratio = rate_limit_ratio
+        self.rate_limit_attempts = rate_limit_attempts
+        self.retry_after = retry_after
+        self.requests = 0
+        self.rate_limited = 0
+        self.tokens = 0
+        self.attempts = {}
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def should_rate_limit(self, prompt):
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        selected = int.from_bytes(digest[:8], "big") / 2 ** 64 < self.rate_limit_ratio
+        with self.lock:
+            self.requests += 1
+            attempt = self.attempts.get(prompt, 0)
+            self.attempts[prompt] = attempt + 1
+            if selected and attempt < self.rate_limit_attempts:
+                self.rate_limited += 1
+                return True
+        return False
+
+    def count_tokens(self, total_tokens):
+        with self.lock:
+            self.tokens += total_tokens
+
+    def snapshot(self):
+        with self.lock:
+            return {"requests": self.requests, "rate_limited": self.rate_limited, "prompts": len(self.attempts),
+                    "tokens": self.tokens}
+
+    def start(self):
+        """Serve on a daemon thread and return self, for use from scripts."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Groq chat completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds before each completion is sent")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="seconds between streamed tokens")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="fraction of prompts that get 429 first")
+    parser.add_argument("--rate-limit-attempts", type=int, default=1, help="429s per selected prompt before it succeeds")
+    parser.add_argument("--retry-after", type=float, default=0.1, help="Retry-After seconds sent with each 429")
+    args = parser.parse_args()
+
+    server = GroqStubServer((args.host, args.port), args.latency, args.token_interval,
+                            args.rate_limit_ratio, args.rate_limit_attempts, args.retry_after)
+    print(f"Groq stub listening on {server.base_url} (set \"base_url\" in groq_config.json to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Synthetic Flux state dicts with the real key names and (optionally scaled) shapes.
+
+Only the hidden size is scaled; the input/output interfaces (64 latent
+channels, 256 timestep features, 768 pooled CLIP, 4096 T5 context) keep
+their real sizes. scale=1.0 produces a full-size ~12B parameter Flux dev.
+"""
+
+from collections import OrderedDict
+
+import torch
+
+FLUX_HIDDEN_SIZE = 3072
+FLUX_NUM_HEADS = 24
+FLUX_DOUBLE_BLOCKS = 19
+FLUX_SINGLE_BLOCKS = 38
+FLUX_IN_CHANNELS = 64
+FLUX_TIME_DIM = 256
+FLUX_VEC_IN_DIM = 768
+FLUX_CONTEXT_IN_DIM = 4096
+FLUX_MLP_RATIO = 4
+
+
+def flux_shapes(scale=1.0, double_blocks=FLUX_DOUBLE_BLOCKS, single_blocks=FLUX_SINGLE_BLOCKS, guidance_embed=True):
+    """Return an ordered {key: shape} map for a Flux transformer."""
+    hidden = max(FLUX_NUM_HEADS, round(FLUX_HIDDEN_SIZE * scale / FLUX_NUM_HEADS) * FLUX_NUM_HEADS)
+    head_dim = hidden // FLUX_NUM_HEADS
+    mlp = hidden * FLUX_MLP_RATIO
+
+    shapes = OrderedDict()
+
+    def linear(name, out_features, in_features):
+        shapes[f"{name}.weight"] = (out_features, in_features)
+        shapes[f"{name}.bias"] = (out_features,)
+
+    linear("img_in", hidden, FLUX_IN_CHANNELS)
+    linear("time_in.in_layer", hidden, FLUX_TIME_DIM)
+    linear("time_in.out_layer", hidden, hidden)
+    linear("vector_in.in_layer", hidden, FLUX_VEC_IN_DIM)
+    linear("vector_in.out_layer", hidden, hidden)
+    if guidance_embed:
+        linear("guidance_in.in_layer", hidden, FLUX_TIME_DIM)
+        linear("guidance_in.out_layer", hidden, hidden)
+    linear("txt_in", hidden, FLUX_CONTEXT_IN_DIM)
+
+    for i in range(double_blocks):
+        for stream in ("img", "txt"):
+            prefix = f"double_blocks.{i}.{stream}"
+            linear(f"{prefix}_mod.lin", 6 * hidden, hidden)
+            linear(f"{prefix}_attn.qkv", 3 * hidden, hidden)
+            shapes[f"{prefix}_attn.norm.query_norm.scale"] = (head_dim,)
+            shapes[f"{prefix}_attn.norm.key_norm.scale"] = (head_dim,)
+            linear(f"{prefix}_attn.proj", hidden, hidden)
+            linear(f"{prefix}_mlp.0", mlp, hidden)
+            linear(f"{prefix}_mlp.2", hidden, mlp)
+
+    for i in range(single_blocks):
+        prefix = f"single_blocks.{i}"
+        linear(f"{prefix}.linear1", 3 * hidden + mlp, hidden)
+        linear(f"{prefix}.linear2", hidden, hidden + mlp)
+        shapes[f"{prefix}.norm.query_norm.scale"] = (head_dim,)
+        shapes[f"{prefix}.norm.key_norm.scale"] = (head_dim,)
+        linear(f"{prefix}.modulation.lin", 3 * hidden, hidden)
+
+    linear("final_layer.linear", FLUX_IN_CHANNELS, hidden)
+    linear("final_layer.adaLN_modulation.1", 2 * hidden, hidden)
+    return shapes
+
+
+def make_flux_state_dict(scale=1.0 / 16, dtype=torch.bfloat16, seed=0, prefix="diffusion_model.", **kwargs):
+    """Build a Flux state dict filled with small random values, keyed as ComfyUI exposes it."""
+    generator = torch.Generator().manual_seed(seed)
+    state_dict = OrderedDict()
+    for key, shape in flux_shapes(scale, **kwargs).items():
+        tensor = torch.empty(shape, dtype=dtype)
+        if tensor.is_floating_point():
+            # Fill in float32 chunks so bf16/fp16 generation does not need a full-size fp32 copy
+            flat = tensor.view(-1)
+            for start in range(0, flat.numel(), 1 << 24):
+                end = min(flat.numel(), start + (1 << 24))
+                flat[start:end] = torch.randn(end - start, generator=generator).mul_(0.02).to(dtype)
+        state_dict[prefix + key] = tensor
+    return state_dict
+
+
+class _SyntheticInner:
+    def __init__(self, state_dict):
+        self._state_dict = state_dict
+
+    def state_dict(self):
+        # nn.Module.state_dict() returns a new dict that shares the tensors
+        return OrderedDict(self._state_dict)
+
+
+class SyntheticModel:
+    """Mimics the ModelPatcher surface the nodes touch: model.model.state_dict() and ckpt_name."""
+
+    def __init__(self, state_dict, ckpt_name="synthetic_flux"):
+        self.model = _SyntheticInner(state_dict)
+        self.ckpt_name = ckpt_name
+
+    def get_model_object(self, name):
+        raise KeyError(name)
+
+
+def state_dict_bytes(state_dict):
+    return sum(t.numel() * t.element_size() for t in state_dict.values())
@@ -1,6 +1,11 @@
 import math
+import threading
+from collections import OrderedDict
+
 import torch
-from comfy.samplers import calculate_sigmas  # For generating initial sigma schedule
+
+from instrumentation import instrument_node
+
 
 class GODARCScheduler:
     @classmethod
@@ -21,6 +26,11 @@ class GODARCScheduler:
     CATEGORY = "MilitantAI/GOD Framework/Schedulers"
     FUNCTION = "get_sigmas"
 
+    # Finished schedules keyed by (model_sampling identity, steps, sigma range, strength, depth)
+    CACHE_SIZE = 64
+    _schedule_cache = OrderedDict()
+    _schedule_lock = threading.Lock()
+
     def __init__(self):
         self.iterations = 0
 
@@ -29,34 +39,61 @@ class GODARCScheduler:
         return 1 / (1 + math.exp(-strength * progress))
 
     def recursive_adjustment(self, sigma, gravity_fn, depth, progress, strength):
-        """Apply recursive adjustments to sigma."""
-        if depth == 0:
-            return sigma
-        adjusted_sigma = gravity_fn(progress, strength) * sigma
-        return self.recursive_adjustment(adjusted_sigma, gravity_fn, depth - 1, progress, strength)
+        """Apply recursive adjustments to sigma.
+
+        Each level multiplies by the same gravity factor, so this equals
+        sigma * gravity_fn(progress, strength) ** depth.
+        """
+        return sigma * gravity_fn(progress, strength) ** depth
 
     def apply_arc_to_sigmas(self, base_sigmas, sigma_min, sigma_max, gravity_strength, recursive_depth):
-        """Apply GOD-ARC logic to adjust sigmas."""
-        adjusted_sigmas = []
-        steps = len(base_sigmas)
-        for i, sigma in enumerate(base_sigmas):
-            progress = i / (steps - 1)
-            adjusted_sigma = self.recursive_adjustment(sigma, self.gravity_fn, recursive_depth, progress, gravity_strength)
-            # Clamp adjusted sigma to valid range
-            adjusted_sigma = max(sigma_min, min(adjusted_sigma, sigma_max))
-            adjusted_sigmas.append(adjusted_sigma)
-        return torch.tensor(adjusted_sigmas)
+        """Apply GOD-ARC logic to adjust sigmas in a single vectorised pass."""
+        base_sigmas = base_sigmas.to(torch.float32)
+        steps = base_sigmas.shape[0]
+        if steps < 2:
+            return base_sigmas.clone()
+        progress = torch.linspace(0.0, 1.0, steps, dtype=base_sigmas.dtype, device=base_sigmas.device)
+        adjusted = base_sigmas * torch.sigmoid(gravity_strength * progress).pow(recursive_depth)
+        # Clamp adjusted sigma to valid range
+        adjusted = adjusted.clamp(min=sigma_min, max=sigma_max)
+        # Samplers expect a non-increasing schedule
+        adjusted = torch.cummin(adjusted, dim=0).values
+        # Keep the terminal zero samplers use to finish denoising
+        terminal_zero = base_sigmas == 0
+        return torch.where(terminal_zero, torch.zeros_like(adjusted), adjusted)
 
+    def cache_key(self, model_sampling, steps, sigma_min, sigma_max, gravity_strength, recursive_depth):
+        # The model's own sigma range guards against a recycled id() after garbage collection
+        model_range = (float(model_sampling.sigma_min), float(model_sampling.sigma_max))
+        return (id(model_sampling), model_range, steps, sigma_min, sigma_max, gravity_strength, recursive_depth)
+
+    @instrument_node("GODARCScheduler")
     def get_sigmas(self, model, steps, sigma_min, sigma_max, rho, gravity_strength, recursive_depth):
         """Generate GOD-ARC adjusted sigmas."""
+        # Imported here so the schedule maths can be used and benchmarked without ComfyUI
+        from comfy.samplers import calculate_sigmas
+
+        model_sampling = model.get_model_object("model_sampling")
+        key = self.cache_key(model_sampling, steps, sigma_min, sigma_max, gravity_strength, recursive_depth)
+        with self._schedule_lock:
+            cached = self._schedule_cache.get(key)
+            if cached is not None:
+                self._schedule_cache.move_to_end(key)
+                return (cached.clone(),)
+
         # Generate base sigmas using calculate_sigmas
-        base_sigmas = calculate_sigmas(model.get_model_object("model_sampling"), "karras", steps).cpu()
+        base_sigmas = calculate_sigmas(model_sampling, "karras", steps).cpu()
 
         # Apply GOD-ARC logic
         adjusted_sigmas = self.apply_arc_to_sigmas(
             base_sigmas, sigma_min, sigma_max, gravity_strength, recursive_depth
         )
-        return (adjusted_sigmas,)
+
+        with self._schedule_lock:
+            self._schedule_cache[key] = adjusted_sigmas
+            while len(self._schedule_cache) > self.CACHE_SIZE:
+                self._schedule_cache.popitem(last=False)
+        return (adjusted_sigmas.clone(),)
 
 
 # Register the node into ComfyUI's NODE_CLASS_MAPPINGS
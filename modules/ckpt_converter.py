@@ -0,0 +1,302 @@
+"""Streaming, restricted .ckpt -> .safetensors converter.
+
+Reads PyTorch zip checkpoints without executing arbitrary pickle code: the
+unpickler resolves only allowlisted globals, and tensor storages are never
+loaded during unpickling. Tensors are then copied one at a time from the zip
+archive straight into the safetensors file, so peak memory stays near one
+chunk (or one tensor for the rare non-contiguous view).
+
+CLI:
+    python modules/ckpt_converter.py model.ckpt [model.safetensors] [--overwrite]
+"""
+
+import argparse
+import json
+import os
+import pickle
+import struct
+import sys
+import zipfile
+from collections import OrderedDict
+
+try:
+    from instrumentation import instrument_node, phase
+except ImportError:
+    # Standalone CLI use from outside the modules folder
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from instrumentation import instrument_node, phase
+
+COPY_CHUNK_BYTES = 16 * 1024 * 1024
+
+# torch storage class name -> (safetensors dtype, bytes per element, torch dtype name)
+STORAGE_TYPES = {
+    "DoubleStorage": ("F64", 8, "float64"),
+    "FloatStorage": ("F32", 4, "float32"),
+    "HalfStorage": ("F16", 2, "float16"),
+    "BFloat16Storage": ("BF16", 2, "bfloat16"),
+    "LongStorage": ("I64", 8, "int64"),
+    "IntStorage": ("I32", 4, "int32"),
+    "ShortStorage": ("I16", 2, "int16"),
+    "CharStorage": ("I8", 1, "int8"),
+    "ByteStorage": ("U8", 1, "uint8"),
+    "BoolStorage": ("BOOL", 1, "bool"),
+}
+
+# Globals that only carry training metadata in Lightning-style checkpoints.
+# They resolve to an inert placeholder and are dropped from the output.
+METADATA_PACKAGES = ("pytorch_lightning", "lightning", "lightning_fabric", "numpy", "_codecs")
+
+
+class StorageRef:
+    def __init__(self, storage_type, key, numel):
+        self.dtype, self.itemsize, self.torch_dtype = STORAGE_TYPES[storage_type]
+        self.key = key
+        self.numel = numel
+
+
+class TensorRef:
+    """Where a tensor's bytes live in the archive; nothing is read until it is written."""
+
+    def __init__(self, storage, offset, size, stride):
+        self.storage = storage
+        self.offset = offset
+        self.shape = list(size)
+        self.stride = list(stride)
+
+    @property
+    def numel(self):
+        n = 1
+        for dim in self.shape:
+            n *= dim
+        return n
+
+    @property
+    def nbytes(self):
+        return self.numel * self.storage.itemsize
+
+    def is_contiguous(self):
+        expected = 1
+        for dim, stride in zip(reversed(self.shape), reversed(self.stride)):
+            if dim != 1 and stride != expected:
+                return False
+            expected *= dim
+        return True
+
+
+class _StorageType:
+    def __init__(self, name):
+        self.name = name
+
+
+class _Placeholder:
+    """Inert stand-in for metadata objects; absorbs construction and state."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __setstate__(self, state):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        return _Placeholder()
+
+
+def _rebuild_tensor_v2(storage, storage_offset, size, stride, requires_grad=False, backward_hooks=None, metadata=None):
+    return TensorRef(storage, storage_offset, size, stride)
+
+
+def _rebuild_parameter(data, requires_grad=False, backward_hooks=None, state=None):
+    return data
+
+
+ALLOWED_GLOBALS = {
+    ("collections", "OrderedDict"): OrderedDict,
+    ("torch._utils", "_rebuild_tensor_v2"): _rebuild_tensor_v2,
+    ("torch._utils", "_rebuild_parameter"): _rebuild_parameter,
+    ("torch._utils", "_rebuild_parameter_with_state"): _rebuild_parameter,
+    **{("torch", name): _StorageType(name) for name in STORAGE_TYPES},
+}
+
+
+class RestrictedUnpickler(pickle.Unpickler):
+    def __init__(self, file, storages):
+        super().__init__(file)
+        self.storages = storages
+
+    def find_class(self, module, name):
+        if (module, name) in ALLOWED_GLOBALS:
+            return ALLOWED_GLOBALS[(module, name)]
+        if module.split(".")[0] in METADATA_PACKAGES:
+            return _Placeholder
+        raise pickle.UnpicklingError(f"Refusing to load non-allowlisted global {module}.{name}")
+
+    def persistent_load(self, pid):
+        # ('storage', storage_type, key, location, numel)
+        if not isinstance(pid, tuple) or pid[0] != "storage" or not isinstance(pid[1], _StorageType):
+            raise pickle.UnpicklingError(f"Unsupported persistent id {pid!r}")
+        storage_type, key, _, numel = pid[1], pid[2], pid[3], pid[4]
+        if key not in self.storages:
+            self.storages[key] = StorageRef(storage_type.name, key, numel)
+        return self.storages[key]
+
+
+def _find_state_dict(obj):
+    """Use the checkpoint's state_dict when present, otherwise the top-level mapping."""
+    if isinstance(obj, dict):
+        for key in ("state_dict", "model", "module"):
+            if isinstance(obj.get(key), dict) and any(isinstance(v, TensorRef) for v in obj[key].values()):
+                return obj[key]
+        return obj
+    raise ValueError("Checkpoint does not contain a state dict")
+
+
+def read_checkpoint_index(archive):
+    """Unpickle data.pkl with the restricted unpickler and return (prefix, {name: TensorRef})."""
+    pickles = [n for n in archive.namelist() if n.endswith("/data.pkl") or n == "data.pkl"]
+    if not pickles:
+        raise ValueError("Not a PyTorch zip checkpoint (no data.pkl)")
+    prefix = os.path.dirname(pickles[0])
+    byteorder_name = f"{prefix}/byteorder" if prefix else "byteorder"
+    if byteorder_name in archive.namelist() and archive.read(byteorder_name).strip() != b"little":
+        raise ValueError("Big-endian checkpoints are not supported")
+
+    with archive.open(pickles[0]) as f:
+        obj = RestrictedUnpickler(f, {}).load()
+    state_dict = _find_state_dict(obj)
+    tensors = OrderedDict((k, v) for k, v in state_dict.items() if isinstance(v, TensorRef))
+    if not tensors:
+        raise ValueError("Checkpoint contains no tensors")
+    return prefix, tensors
+
+
+def _copy_contiguous(archive, member, offset, nbytes, out):
+    with archive.open(member) as src:
+        src.seek(offset)
+        remaining = nbytes
+        while remaining:
+            chunk = src.read(min(COPY_CHUNK_BYTES, remaining))
+            if not chunk:
+                raise ValueError(f"Storage {member} is truncated")
+            out.write(chunk)
+            remaining -= len(chunk)
+
+
+def _copy_strided(archive, member, ref, out):
+    """Materialise a non-contiguous view; only this one tensor is held in memory."""
+    import torch
+
+    dtype = getattr(torch, ref.storage.torch_dtype)
+    data = bytearray(archive.read(member))
+    storage = torch.frombuffer(data, dtype=dtype) if data else torch.empty(0, dtype=dtype)
+    tensor = storage.as_strided(ref.shape, ref.stride, ref.offset).contiguous()
+    out.write(tensor.view(-1).view(torch.uint8).numpy().tobytes())
+
+
+def convert_checkpoint(ckpt_path, output_path=None, overwrite=False):
+    """Convert a .ckpt to .safetensors, streaming one tensor at a time. Returns the output path."""
+    output_path = output_path or os.path.splitext(ckpt_path)[0] + ".safetensors"
+    if os.path.exists(output_path) and not overwrite:
+        raise FileExistsError(f"{output_path} already exists")
+    if not zipfile.is_zipfile(ckpt_path):
+        raise ValueError(f"{ckpt_path} is a legacy (pre-zip) checkpoint and cannot be streamed; re-save it with torch>=1.6")
+
+    with zipfile.ZipFile(ckpt_path) as archive:
+        with phase("index"):
+            prefix, tensors = read_checkpoint_index(archive)
+
+        header = {"__metadata__": {"format": "pt", "converted_from": os.path.basename(ckpt_path)}}
+        offset = 0
+        for name, ref in tensors.items():
+            header[name] = {"dtype": ref.storage.dtype, "shape": ref.shape, "data_offsets": [offset, offset + ref.nbytes]}
+            offset += ref.nbytes
+        header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        # Pad the header so tensor data starts 8-byte aligned
+        header_bytes += b" " * (-len(header_bytes) % 8)
+
+        tmp_path = output_path + ".tmp"
+        try:
+            with phase("write"), open(tmp_path, "wb") as out:
+                out.write(struct.pack("<Q", len(header_bytes)))
+                out.write(header_bytes)
+                for name, ref in tensors.items():
+                    member = f"{prefix}/data/{ref.storage.key}" if prefix else f"data/{ref.storage.key}"
+                    if ref.is_contiguous():
+                        _copy_contiguous(archive, member, ref.offset * ref.storage.itemsize, ref.nbytes, out)
+                    else:
+                        _copy_strided(archive, member, ref, out)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    print(f"Converted {len(tensors)} tensors ({offset / (1024**3):.2f} GB) from {ckpt_path} to {output_path}")
+    return output_path
+
+
+class CkptToSafetensorsNode:
+    @classmethod
+    def INPUT_TYPES(cls):
+        import folder_paths
+        return {
+            "required": {
+                "ckpt_name": (cls.list_ckpt_files(folder_paths),),
+                "overwrite": ("BOOLEAN", {"default": False}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("safetensors_path",)
+    FUNCTION = "convert"
+    OUTPUT_NODE = True
+    CATEGORY = "MilitantAI/Switchblade/Model Merging"
+
+    FOLDERS = ("checkpoints", "unet")
+
+    @classmethod
+    def list_ckpt_files(cls, folder_paths):
+        files = []
+        for folder in cls.FOLDERS:
+            try:
+                files.extend(f"{folder}/{f}" for f in folder_paths.get_filename_list(folder) if f.endswith(".ckpt"))
+            except KeyError:
+                continue
+        return sorted(files)
+
+    @instrument_node("CkptToSafetensorsNode")
+    def convert(self, ckpt_name, overwrite=False):
+        import folder_paths
+        folder, name = ckpt_name.split("/", 1)
+        ckpt_path = folder_paths.get_full_path(folder, name)
+        if ckpt_path is None:
+            return (f"Error: {ckpt_name} not found",)
+        try:
+            # Written next to the .ckpt, where ComfyUI's own loaders list it
+            return (convert_checkpoint(ckpt_path, overwrite=overwrite),)
+        except FileExistsError as e:
+            return (f"Error: {e} (enable overwrite to replace it)",)
+        # A malformed archive surfaces as KeyError (missing data/<key> member), EOFError
+        # (truncated pickle) or IndexError/TypeError (bad persistent id or REDUCE target)
+        except (ValueError, KeyError, EOFError, IndexError, TypeError, pickle.UnpicklingError, zipfile.BadZipFile) as e:
+            return (f"Error converting {ckpt_name}: {e}",)
+
+
+NODE_CLASS_MAPPINGS = {
+    "CkptToSafetensorsNode": CkptToSafetensorsNode
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "CkptToSafetensorsNode": "Convert Checkpoint to Safetensors"
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a PyTorch .ckpt to .safetensors without unpickling arbitrary code.")
+    parser.add_argument("ckpt")
+    parser.add_argument("output", nargs="?")
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args()
+    convert_checkpoint(args.ckpt, args.output, args.overwrite)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import os
 import folder_paths
 from collections import defaultdict
 from safetensors.torch import save_file
+from instrumentation import instrument_node, phase
 
 class FluxQuantNode:
     @classmethod
@@ -20,6 +21,7 @@ class FluxQuantNode:
     FUNCTION = "analyse_and_save_model"
     CATEGORY = "MilitantAI/Switchblade/Model Merging"
 
+    @instrument_node("FluxQuantNode")
     def analyse_and_save_model(self, model, precision):
         try:
             device, chosen_precision = self.get_device_and_precision(precision)
@@ -29,33 +31,39 @@ class FluxQuantNode:
             print(f"Loaded model with {len(model_state_dict)} tensors.")
 
             # Convert tensors to selected precision
-            model_state_dict = self.convert_to_selected_precision(model_state_dict, chosen_precision, device)
+            with phase("convert"):
+                model_state_dict = self.convert_to_selected_precision(model_state_dict, chosen_precision, device)
 
             # Perform analysis
-            analysis = {
-                "structure": self.analyse_structure(model_state_dict),
-                "size_info": self.analyse_size(model_state_dict),
-                "block_info": self.analyse_blocks(model_state_dict),
-                "dtype_info": self.analyse_dtypes(model_state_dict),
-                "additional_info": {
-                    "total_tensors": len(model_state_dict),
-                    "total_size_gb": sum(t.numel() * t.element_size() for t in model_state_dict.values()) / (1024**3)
-                }
-            }
+            with phase("analyse"):
+                analysis = self.build_analysis(model_state_dict)
+
 
-            
             file_name = model.ckpt_name if hasattr(model, 'ckpt_name') else "unknown_model"
             file_name = f"{file_name}_{chosen_precision}.safetensors"
 
 
             # Save the processed model
-            self.save_model(model_state_dict, file_name, chosen_precision)
+            with phase("write"):
+                self.save_model(model_state_dict, file_name, chosen_precision)
 
             return (json.dumps(analysis, indent=2), f"Model saved as {file_name}")
 
         except Exception as e:
             return (f"Error processing model: {str(e)}", "")
 
+    def build_analysis(self, model_state_dict):
+        return {
+            "structure": self.analyse_structure(model_state_dict),
+            "size_info": self.analyse_size(model_state_dict),
+            "block_info": self.analyse_blocks(model_state_dict),
+            "dtype_info": self.analyse_dtypes(model_state_dict),
+            "additional_info": {
+                "total_tensors": len(model_state_dict),
+                "total_size_gb": sum(t.numel() * t.element_size() for t in model_state_dict.values()) / (1024**3)
+            }
+        }
+
     def get_device_and_precision(self, user_selection):
         """Determine the best device and user-selected precision."""
         device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
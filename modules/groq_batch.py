@@ -0,0 +1,165 @@
+import asyncio
+import random
+import time
+
+import httpx
+from groq import AsyncGroq, APITimeoutError, APIConnectionError, RateLimitError, InternalServerError
+
+
+def estimate_tokens(text):
+    """Rough token estimate (~4 characters per token) used before the API reports usage."""
+    return max(1, len(text) // 4)
+
+
+def split_prompts(prompts):
+    """Accept a list of prompts or a newline-separated string; blank lines are dropped."""
+    if isinstance(prompts, str):
+        prompts = prompts.splitlines()
+    return [p.strip() for p in prompts if p and p.strip()]
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `rate_per_minute`.
+
+    A rate of 0 disables the limit. Balances may go negative after `adjust`,
+    which simply delays later callers until the debt is repaid. A refund wakes
+    a waiting caller straight away instead of after its computed sleep.
+    """
+
+    def __init__(self, rate_per_minute):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.refunded = asyncio.Event()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        if self.rate <= 0:
+            return
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                self.refunded.clear()
+                try:
+                    await asyncio.wait_for(self.refunded.wait(), (amount - self.tokens) / self.rate)
+                except asyncio.TimeoutError:
+                    pass
+
+    def adjust(self, delta):
+        """Return (positive) or charge (negative) tokens once the real cost is known."""
+        if self.rate <= 0:
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + delta)
+        if delta > 0:
+            self.refunded.set()
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0, retry_after=None):
+    """Full-jitter exponential backoff, never shorter than a server Retry-After."""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class BatchEnhancer:
+    """Send many prompts concurrently while honouring requests- and tokens-per-minute limits."""
+
+    RETRYABLE = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+    def __init__(self, api_key, model, system_prompt="", temperature=0.5, max_tokens=1024, top_p=1,
+                 concurrency=8, requests_per_minute=30, tokens_per_minute=6000, max_retries=5,
+                 expected_completion_tokens=256, base_url=None, timeout=60.0):
+        self.api_key = api_key
+        self.model = model
+        self.system_prompt = system_prompt
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.top_p = top_p
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.expected_completion_tokens = expected_completion_tokens
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def build_messages(self, text):
+        messages = []
+        if self.system_prompt:
+            messages.append({"role": "system", "content": self.system_prompt})
+        messages.append({"role": "user", "content": text})
+        return messages
+
+    async def _enhance_one(self, client, semaphore, request_bucket, token_bucket, text):
+        estimate = estimate_tokens(self.system_prompt) + estimate_tokens(text) + min(self.max_tokens, self.expected_completion_tokens)
+        attempt = 0
+        while True:
+            await request_bucket.acquire(1)
+            await token_bucket.acquire(estimate)
+            try:
+                async with semaphore:
+                    completion = await client.chat.completions.create(
+                        model=self.model,
+                        messages=self.build_messages(text),
+                        temperature=self.temperature,
+                        max_tokens=self.max_tokens,
+                        top_p=self.top_p,
+                        stop=None,
+                        stream=False,
+                    )
+            except self.RETRYABLE as e:
+                # A rejected or failed attempt used no tokens; don't let it drain the TPM budget
+                token_bucket.adjust(estimate)
+                if attempt >= self.max_retries:
+                    return f"Groq API Error after {attempt + 1} attempts: {e}"
+                await asyncio.sleep(backoff_delay(attempt, retry_after=_retry_after(e)))
+                attempt += 1
+                continue
+            except Exception as e:
+                return f"Groq API Error: {e}"
+
+            usage = getattr(completion, "usage", None)
+            if usage is not None and getattr(usage, "total_tokens", None):
+                token_bucket.adjust(estimate - usage.total_tokens)
+            # content is None when the model returns no text (e.g. an immediate stop)
+            return completion.choices[0].message.content or ""
+
+    async def enhance(self, prompts):
+        """Enhance every prompt; results are returned in input order."""
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        request_bucket = TokenBucket(self.requests_per_minute)
+        token_bucket = TokenBucket(self.tokens_per_minute)
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max(1, self.concurrency), max_keepalive_connections=max(1, self.concurrency)),
+            timeout=self.timeout,
+        )
+        async with AsyncGroq(api_key=self.api_key, base_url=self.base_url, max_retries=0, http_client=http_client) as client:
+            tasks = [self._enhance_one(client, semaphore, request_bucket, token_bucket, text) for text in prompts]
+            return await asyncio.gather(*tasks)
+
+    def run(self, prompts):
+        """Synchronous entry point; runs on a private event loop so it is safe from ComfyUI's worker thread."""
+        return asyncio.run(self.enhance(prompts))
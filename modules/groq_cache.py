@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def make_cache_key(model, system_prompt, text, temperature, max_tokens, top_p, stop=None):
+    """Stable hash of everything that determines a completion."""
+    fields = [model, system_prompt, text, temperature, max_tokens, top_p]
+    if stop:
+        fields.append(stop)
+    payload = json.dumps(fields, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Persistent LRU cache of Groq responses backed by SQLite.
+
+    WAL mode and a busy timeout make it safe to share between ComfyUI worker
+    processes; each thread/process gets its own connection.
+    """
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_entries=10000, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL,"
+                " accessed REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._init_totals(conn)
+
+    def _init_totals(self, conn):
+        """Keep entry count and byte size as running totals in the stats table.
+
+        Triggers update them in the same transaction as every insert, update
+        and delete, so neither eviction nor stats() has to scan the table.
+        Caches created before the totals existed are counted once here.
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN"
+                " UPDATE stats SET value = value + 1 WHERE name = 'entries';"
+                " UPDATE stats SET value = value + NEW.size WHERE name = 'size_bytes'; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses BEGIN"
+                " UPDATE stats SET value = value + NEW.size - OLD.size WHERE name = 'size_bytes'; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN"
+                " UPDATE stats SET value = value - 1 WHERE name = 'entries';"
+                " UPDATE stats SET value = value - OLD.size WHERE name = 'size_bytes'; END"
+            )
+            conn.execute("INSERT OR IGNORE INTO stats (name, value) SELECT 'entries', COUNT(*) FROM responses")
+            conn.execute("INSERT OR IGNORE INTO stats (name, value) SELECT 'size_bytes', COALESCE(SUM(size), 0) FROM responses")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _totals(self, conn):
+        rows = dict(conn.execute("SELECT name, value FROM stats WHERE name IN ('entries', 'size_bytes')").fetchall())
+        return rows.get("entries", 0), rows.get("size_bytes", 0)
+
+    def _connect(self):
+        # Connections must not cross a fork, so they are keyed by pid as well as thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, conn, name):
+        with self._stats_lock:
+            if name == "hits":
+                self.hits += 1
+            else:
+                self.misses += 1
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, key):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count(conn, "misses")
+            return None
+        value, created = row
+        if self.ttl_seconds and now - created > self.ttl_seconds:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._count(conn, "misses")
+            return None
+        conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        self._count(conn, "hits")
+        return value
+
+    def put(self, key, value):
+        conn = self._connect()
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # An upsert rather than INSERT OR REPLACE: REPLACE deletes the old row
+            # without firing the delete trigger, which would skew the totals
+            conn.execute(
+                "INSERT INTO responses (key, value, created, accessed, size) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET value = excluded.value, created = excluded.created,"
+                " accessed = excluded.accessed, size = excluded.size",
+                (key, value, now, now, size),
+            )
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn, now):
+        if self.ttl_seconds:
+            conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        count, total = self._totals(conn)
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Walk from least recently used, dropping rows until both caps are met
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed ASC"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self):
+        conn = self._connect()
+        # The delete trigger brings the entry and size totals back to zero
+        conn.execute("DELETE FROM responses")
+        conn.execute("DELETE FROM stats WHERE name IN ('hits', 'misses')")
+
+    def stats(self):
+        conn = self._connect()
+        persisted = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+        return {
+            "entries": persisted.get("entries", 0),
+            "size_bytes": persisted.get("size_bytes", 0),
+            "hits": self.hits,
+            "misses": self.misses,
+            "total_hits": persisted.get("hits", 0),
+            "total_misses": persisted.get("misses", 0),
+        }
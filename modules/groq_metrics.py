@@ -0,0 +1,64 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class RollingMetrics:
+    """Per-call latency metrics kept in memory and appended to a size-capped JSONL log.
+
+    When the log grows past `max_bytes` it is moved to `<path>.1`, so at most
+    two files are ever on disk.
+    """
+
+    def __init__(self, path, max_bytes=5 * 1024 * 1024, window=1000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.records = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record(self, model, mode, ttft_s, total_s, completion_tokens, stopped_early=False):
+        entry = {
+            "timestamp": time.time(),
+            "model": model,
+            "mode": mode,
+            "ttft_ms": ttft_s * 1000 if ttft_s is not None else None,
+            "total_ms": total_s * 1000,
+            "completion_tokens": completion_tokens,
+            "tokens_per_s": completion_tokens / total_s if total_s > 0 and completion_tokens else 0.0,
+            "stopped_early": stopped_early,
+        }
+        with self.lock:
+            self.records.append(entry)
+            try:
+                if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except OSError as e:
+                print(f"Error writing Groq metrics to {self.path}: {e}")
+        return entry
+
+    def summary(self, model=None):
+        """p50/p95 time-to-first-token and latency plus mean tokens/sec over the window."""
+        with self.lock:
+            entries = [e for e in self.records if model is None or e["model"] == model]
+        ttft = [e["ttft_ms"] for e in entries if e["ttft_ms"] is not None]
+        total = [e["total_ms"] for e in entries]
+        tps = [e["tokens_per_s"] for e in entries if e["tokens_per_s"]]
+        return {
+            "calls": len(entries),
+            "ttft_p50_ms": _percentile(ttft, 0.5),
+            "ttft_p95_ms": _percentile(ttft, 0.95),
+            "total_p50_ms": _percentile(total, 0.5),
+            "total_p95_ms": _percentile(total, 0.95),
+            "tokens_per_s_mean": sum(tps) / len(tps) if tps else None,
+        }
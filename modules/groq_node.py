@@ -1,15 +1,176 @@
 import json
 import os
-import subprocess
-import sys
+import sqlite3
 import stat
+import threading
+import time
+from contextlib import contextmanager
+
+# groq is an optional dependency: the pack registry disables these nodes when it
+# is missing instead of installing it at import time (pip install groq).
+import httpx
+from groq import Groq, APITimeoutError, APIConnectionError
+
+from groq_cache import ResponseCache, make_cache_key
+from groq_batch import BatchEnhancer, split_prompts
+from groq_metrics import RollingMetrics
+from instrumentation import instrument_node
+
+DEFAULT_POOL_SETTINGS = {
+    "max_connections": 10,
+    "max_keepalive_connections": 5,
+    "keepalive_expiry": 30.0,
+    "timeout": 60.0,
+    "connect_timeout": 5.0,
+}
+
+# Process-wide client pool keyed by API key and pool settings, so every node
+# instance reuses the same keep-alive connections instead of a new TLS handshake per call.
+_CLIENT_POOL = {}
+_CLIENT_POOL_LOCK = threading.Lock()
+
+# Parsed config per path, refreshed only when the file's mtime changes.
+_CONFIG_CACHE = {}
+
+DEFAULT_CACHE_SETTINGS = {
+    "enabled": True,
+    "path": "groq_cache.sqlite3",
+    "ttl_hours": 168.0,
+    "max_entries": 10000,
+    "max_mb": 256.0,
+}
+
+_RESPONSE_CACHES = {}
+_RESPONSE_CACHES_LOCK = threading.Lock()
+
+# Connection setup time of the in-flight request, per thread. httpx reports
+# TCP connect and TLS handshake through the request's "trace" extension and
+# only fires them when the pool opens a new connection.
+_CONNECT_TRACE = threading.local()
+CONNECT_EVENTS = ("connection.connect_tcp", "connection.start_tls")
+
+# Rolling per-call latency log used to compare models on real numbers
+METRICS = RollingMetrics(os.path.join(os.path.dirname(__file__), "groq_metrics.jsonl"))
+
+
+def get_pool_settings(config):
+    settings = dict(DEFAULT_POOL_SETTINGS)
+    settings.update({k: v for k, v in config.get("pool", {}).items() if k in DEFAULT_POOL_SETTINGS})
+    return settings
+
+
+def _trace_connection(event_name, info):
+    timings = getattr(_CONNECT_TRACE, "timings", None)
+    if timings is None:
+        return
+    step, _, status = event_name.rpartition(".")
+    if step not in CONNECT_EVENTS:
+        return
+    if status == "started":
+        timings["started"][step] = time.perf_counter()
+    elif step in timings["started"]:
+        timings["connect_s"] += time.perf_counter() - timings["started"].pop(step)
+
+
+def _attach_connection_trace(request):
+    request.extensions["trace"] = _trace_connection
+
+
+@contextmanager
+def measure_connect():
+    """Collect time spent opening connections (TCP + TLS) for requests sent in this block.
+
+    Yields a dict whose "connect_s" is 0.0 when a pooled keep-alive connection was reused.
+    """
+    timings = {"connect_s": 0.0, "started": {}}
+    _CONNECT_TRACE.timings = timings
+    try:
+        yield timings
+    finally:
+        _CONNECT_TRACE.timings = None
+
+
+def get_client(api_key, settings=None, base_url=None):
+    """Return a pooled Groq client for this API key, creating it on first use."""
+    settings = settings or DEFAULT_POOL_SETTINGS
+    key = (api_key, base_url, tuple(sorted(settings.items())))
+    with _CLIENT_POOL_LOCK:
+        client = _CLIENT_POOL.get(key)
+        if client is None:
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=settings["max_connections"],
+                    max_keepalive_connections=settings["max_keepalive_connections"],
+                    keepalive_expiry=settings["keepalive_expiry"],
+                ),
+                timeout=httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"]),
+                event_hooks={"request": [_attach_connection_trace]},
+            )
+            client = Groq(api_key=api_key, base_url=base_url, http_client=http_client)
+            _CLIENT_POOL[key] = client
+        return client
+
+
+def get_response_cache(config):
+    """Return the shared response cache described by config, or None when disabled."""
+    settings = dict(DEFAULT_CACHE_SETTINGS)
+    settings.update({k: v for k, v in config.get("cache", {}).items() if k in DEFAULT_CACHE_SETTINGS})
+    if not settings["enabled"]:
+        return None
+    path = settings["path"]
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(__file__), path)
+    key = (path, settings["ttl_hours"], settings["max_entries"], settings["max_mb"])
+    with _RESPONSE_CACHES_LOCK:
+        cache = _RESPONSE_CACHES.get(key)
+        if cache is None:
+            try:
+                cache = ResponseCache(
+                    path,
+                    ttl_seconds=settings["ttl_hours"] * 3600,
+                    max_entries=settings["max_entries"],
+                    max_bytes=settings["max_mb"] * 1024 * 1024,
+                )
+            except sqlite3.Error as e:
+                print(f"Groq response cache unavailable at {path}, continuing without caching: {e}")
+                return None
+            _RESPONSE_CACHES[key] = cache
+        return cache
+
+
+# The cache is an optimisation only: a locked, corrupt or read-only database
+# must never fail a node or throw away a completion that was already paid for.
+
+def cache_get(cache, key):
+    try:
+        return cache.get(key)
+    except sqlite3.Error as e:
+        print(f"Groq response cache read failed, continuing without caching: {e}")
+        return None
+
+
+def cache_put(cache, key, value):
+    try:
+        cache.put(key, value)
+    except sqlite3.Error as e:
+        print(f"Groq response cache write failed, result not cached: {e}")
+
+
+def cache_stats(cache):
+    try:
+        return cache.stats()
+    except sqlite3.Error as e:
+        print(f"Groq response cache stats unavailable: {e}")
+        return None
+
+
+def close_clients():
+    """Close every pooled client and its connections."""
+    with _CLIENT_POOL_LOCK:
+        for client in _CLIENT_POOL.values():
+            client.close()
+        _CLIENT_POOL.clear()
 
-try:
-    from groq import Groq, APITimeoutError, APIConnectionError
-except ImportError:
-    print("Installing groq library...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "groq"])
-    from groq import Groq, APITimeoutError, APIConnectionError
 
 class GroqAPIPromptEnhancer:
     def __init__(self):
@@ -18,8 +179,14 @@ class GroqAPIPromptEnhancer:
 
     def load_config(self):
         try:
+            mtime = os.stat(self.config_path).st_mtime_ns
+            cached = _CONFIG_CACHE.get(self.config_path)
+            if cached and cached[0] == mtime:
+                self.config = cached[1]
+                return
             with open(self.config_path, "r") as f:
                 self.config = json.load(f)
+            _CONFIG_CACHE[self.config_path] = (mtime, self.config)
         except FileNotFoundError:
             # Create a config with default values
             self.config = {"api_key": "", "system_prompt": ""}
@@ -45,22 +212,46 @@ class GroqAPIPromptEnhancer:
             },
             "optional": {
                 "override_system_prompt": ("STRING", {"multiline": True}),
+                "cache_mode": (["use", "bypass", "refresh"], {"default": "use"}),
+                "stream": ("BOOLEAN", {"default": False}),
+                "stop_sequence": ("STRING", {"default": ""}),
+                "token_budget": ("INT", {"default": 0, "min": 0, "max": 1024}),
             }
         }
 
-    RETURN_TYPES = ("STRING",)
-    RETURN_NAMES = ("enhanced_text",)
+    TEMPERATURE = 0.5
+    MAX_TOKENS = 1024
+    TOP_P = 1
+
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("enhanced_text", "latency_info")
     FUNCTION = "execute"
     CATEGORY = "MilitantAI/Switchblade/Text Processing"
 
-    def execute(self, model, text, override_system_prompt=None):
+    @instrument_node("GroqAPIPromptEnhancer")
+    def execute(self, model, text, override_system_prompt=None, cache_mode="use", stream=False, stop_sequence="", token_budget=0):
+        # Cheap mtime check; only rereads groq_config.json when it was edited
+        self.load_config()
         if not self.config.get("api_key"):
-            return ("Error: API key not configured. Please edit groq_config.json",)
+            return ("Error: API key not configured. Please edit groq_config.json", "")
 
         # Correctly handle the default system prompt
         system_prompt_to_use = override_system_prompt if override_system_prompt else self.config.get("system_prompt", "")
 
-        client = Groq(api_key=self.config["api_key"])
+        stop_sequence = stop_sequence.replace("\\n", "\n") if stop_sequence else ""
+        max_tokens = min(token_budget, self.MAX_TOKENS) if token_budget else self.MAX_TOKENS
+
+        cache = get_response_cache(self.config) if cache_mode != "bypass" else None
+        cache_key = make_cache_key(model, system_prompt_to_use, text, self.TEMPERATURE, max_tokens, self.TOP_P, stop_sequence)
+        if cache is not None and cache_mode == "use":
+            start = time.perf_counter()
+            cached = cache_get(cache, cache_key)
+            if cached is not None:
+                latency = {"total_ms": (time.perf_counter() - start) * 1000, "cache": "hit", "cache_stats": cache_stats(cache)}
+                print(f"Groq {model}: cache hit in {latency['total_ms'] * 1000:.0f} us")
+                return (cached, json.dumps(latency))
+
+        client = get_client(self.config["api_key"], get_pool_settings(self.config), self.config.get("base_url") or None)
 
         messages = []
         if system_prompt_to_use:
@@ -68,28 +259,189 @@ class GroqAPIPromptEnhancer:
         messages.append({"role": "user", "content": text})
 
         try:
+            if stream:
+                content, latency = self.complete_streaming(client, model, messages, max_tokens, stop_sequence)
+            else:
+                content, latency = self.complete(client, model, messages, max_tokens, stop_sequence)
+            latency["model_summary"] = METRICS.summary(model)
+            if cache is not None and content:
+                cache_put(cache, cache_key, content)
+                latency["cache"] = "miss" if cache_mode == "use" else "refresh"
+                latency["cache_stats"] = cache_stats(cache)
+            return (content, json.dumps(latency))
+
+        except APITimeoutError as e:
+            return (f"Groq API Timeout Error: {e}", "")
+        except APIConnectionError as e:
+            return (f"Groq API Connection Error: {e}", "")
+        except Exception as e:
+            return (f"Groq API Error: {e}", "")
+
+    def complete(self, client, model, messages, max_tokens, stop_sequence):
+        start = time.perf_counter()
+        with measure_connect() as timings:
             completion = client.chat.completions.create(
                 model=model,
                 messages=messages,
-                temperature=0.5,
-                max_tokens=1024,
-                top_p=1,
-                stop=None,
+                temperature=self.TEMPERATURE,
+                max_tokens=max_tokens,
+                top_p=self.TOP_P,
+                stop=[stop_sequence] if stop_sequence else None,
                 stream=False
             )
-            return (completion.choices[0].message.content,)
+        elapsed = time.perf_counter() - start
+        latency = self.split_latency(completion, elapsed, timings["connect_s"])
+        print(f"Groq {model}: total {latency['total_ms']:.1f} ms "
+              f"(connect {latency['connect_ms']:.1f} ms, network {latency['network_ms']:.1f} ms, model {latency['model_ms']:.1f} ms)")
+        usage = getattr(completion, "usage", None)
+        tokens = getattr(usage, "completion_tokens", None) or 0
+        latency.update(METRICS.record(model, "sync", None, elapsed, tokens))
+        return completion.choices[0].message.content or "", latency
+
+    def complete_streaming(self, client, model, messages, max_tokens, stop_sequence):
+        """Consume the token stream incrementally, closing it early on the stop sequence or token budget."""
+        start = time.perf_counter()
+        ttft = None
+        pieces = []
+        tail = ""
+        chunks = 0
+        usage = None
+        stopped_early = False
+        with measure_connect() as timings:
+            response = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=self.TEMPERATURE,
+                max_tokens=max_tokens,
+                top_p=self.TOP_P,
+                stop=[stop_sequence] if stop_sequence else None,
+                stream=True
+            )
+        try:
+            for chunk in response:
+                x_groq = getattr(chunk, "x_groq", None)
+                if x_groq is not None and x_groq.usage is not None:
+                    usage = x_groq.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                pieces.append(delta)
+                chunks += 1
+                # Only the recent tail can contain a stop sequence that just completed
+                tail = (tail + delta)[-(len(stop_sequence) + len(delta)):]
+                if stop_sequence and stop_sequence in tail:
+                    stopped_early = True
+                    break
+                if chunks >= max_tokens:
+                    stopped_early = True
+                    break
+        finally:
+            # Closing mid-stream drops the connection so the server stops generating
+            response.close()
+        elapsed = time.perf_counter() - start
+
+        content = "".join(pieces)
+        if stop_sequence and stop_sequence in content:
+            content = content[:content.index(stop_sequence)]
+        tokens = getattr(usage, "completion_tokens", None) or chunks
+        latency = {"total_ms": elapsed * 1000, "connect_ms": timings["connect_s"] * 1000}
+        latency.update(METRICS.record(model, "stream", ttft, elapsed, tokens, stopped_early))
+        print(f"Groq {model}: ttft {latency['ttft_ms'] or 0:.1f} ms, total {latency['total_ms']:.1f} ms, "
+              f"{latency['tokens_per_s']:.1f} tok/s{' (stopped early)' if stopped_early else ''}")
+        return content, latency
+
+    def split_latency(self, completion, elapsed, connect_time=0.0):
+        """Split wall time into measured connection setup, server-side model time (from usage)
+        and the remaining network/transfer time."""
+        usage = getattr(completion, "usage", None)
+        model_time = (getattr(usage, "total_time", None) or 0.0) + (getattr(usage, "queue_time", None) or 0.0)
+        connect_time = min(connect_time, elapsed)
+        model_time = min(model_time, elapsed - connect_time)
+        return {
+            "total_ms": elapsed * 1000,
+            "connect_ms": connect_time * 1000,
+            "model_ms": model_time * 1000,
+            "network_ms": (elapsed - connect_time - model_time) * 1000,
+        }
+
+class GroqAPIBatchPromptEnhancer(GroqAPIPromptEnhancer):
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "model": (["gemma2-9b-it", "llama-3.1-8b-instant", "llama-3.3-70b-versatile"],),
+                "prompts": ("STRING", {"multiline": True}),
+                "concurrency": ("INT", {"default": 8, "min": 1, "max": 256}),
+                "requests_per_minute": ("INT", {"default": 30, "min": 0, "max": 100000}),
+                "tokens_per_minute": ("INT", {"default": 6000, "min": 0, "max": 10000000}),
+                "max_retries": ("INT", {"default": 5, "min": 0, "max": 20}),
+            },
+            "optional": {
+                "override_system_prompt": ("STRING", {"multiline": True}),
+                "cache_mode": (["use", "bypass", "refresh"], {"default": "use"}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("enhanced_text", "batch_info")
+    FUNCTION = "execute_batch"
+
+    @instrument_node("GroqAPIBatchPromptEnhancer")
+    def execute_batch(self, model, prompts, concurrency, requests_per_minute, tokens_per_minute, max_retries,
+                      override_system_prompt=None, cache_mode="use"):
+        self.load_config()
+        if not self.config.get("api_key"):
+            return ("Error: API key not configured. Please edit groq_config.json", "")
+
+        system_prompt_to_use = override_system_prompt if override_system_prompt else self.config.get("system_prompt", "")
+        prompts = split_prompts(prompts)
+        if not prompts:
+            return ("", "")
+
+        # Serve what we can from the cache and only send the misses
+        cache = get_response_cache(self.config) if cache_mode != "bypass" else None
+        keys = [make_cache_key(model, system_prompt_to_use, p, self.TEMPERATURE, self.MAX_TOKENS, self.TOP_P) for p in prompts]
+        results = [cache_get(cache, k) if cache is not None and cache_mode == "use" else None for k in keys]
+        pending = [i for i, r in enumerate(results) if r is None]
+
+        start = time.perf_counter()
+        if pending:
+            pool = get_pool_settings(self.config)
+            enhancer = BatchEnhancer(
+                self.config["api_key"], model, system_prompt_to_use,
+                temperature=self.TEMPERATURE, max_tokens=self.MAX_TOKENS, top_p=self.TOP_P,
+                concurrency=concurrency, requests_per_minute=requests_per_minute,
+                tokens_per_minute=tokens_per_minute, max_retries=max_retries,
+                base_url=self.config.get("base_url") or None, timeout=pool["timeout"],
+            )
+            for i, content in zip(pending, enhancer.run([prompts[i] for i in pending])):
+                results[i] = content
+                if cache is not None and content and not content.startswith("Groq API Error"):
+                    cache_put(cache, keys[i], content)
+        elapsed = time.perf_counter() - start
+
+        info = {
+            "prompts": len(prompts),
+            "cached": len(prompts) - len(pending),
+            "sent": len(pending),
+            "errors": sum(1 for r in results if r.startswith("Groq API Error")),
+            "total_ms": elapsed * 1000,
+        }
+        print(f"Groq batch {model}: {info['sent']} sent, {info['cached']} cached, {info['errors']} errors in {elapsed:.1f} s")
+        # Results are kept one per line so output order matches input order
+        return ("\n".join(r.replace("\n", " ") for r in results), json.dumps(info))
 
-        except APITimeoutError as e:
-            return (f"Groq API Timeout Error: {e}",)
-        except APIConnectionError as e:
-            return (f"Groq API Connection Error: {e}",)
-        except Exception as e:
-            return (f"Groq API Error: {e}",)
 
 NODE_CLASS_MAPPINGS = {
-    "GroqAPIPromptEnhancer": GroqAPIPromptEnhancer
+    "GroqAPIPromptEnhancer": GroqAPIPromptEnhancer,
+    "GroqAPIBatchPromptEnhancer": GroqAPIBatchPromptEnhancer,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
-    "GroqAPIPromptEnhancer": "Groq API Prompt Enhancer"
+    "GroqAPIPromptEnhancer": "Groq API Prompt Enhancer",
+    "GroqAPIBatchPromptEnhancer": "Groq API Batch Prompt Enhancer",
 }
\ No newline at end of file
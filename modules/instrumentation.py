@@ -0,0 +1,240 @@
+"""Per-node and per-phase timing / memory instrumentation for the Switchblade nodes.
+
+Disabled by default. Enable with the SWITCHBLADE_INSTRUMENT=1 environment
+variable or `enable()`. Setting SWITCHBLADE_TRACE=<path.json> (or passing
+`trace_path`) also records a Chrome trace (chrome://tracing, Perfetto) that
+is written at exit or by `export_trace()`.
+
+Records go to the "switchblade" logger, with the measurements attached to the
+log record as `record.switchblade`.
+
+Memory is the process's current RSS, read from /proc/self/statm (or psutil
+where /proc is unavailable) at the start and end of each block and every
+RSS_SAMPLE_INTERVAL seconds in between by a background thread, so
+`peak_rss_mb` is the highest RSS seen during that block. Without either
+source the memory fields are None.
+"""
+
+import atexit
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger("switchblade")
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+RSS_SAMPLE_INTERVAL = 0.01
+
+
+class _State:
+    enabled = False
+    trace_path = None
+    events = []
+    lock = threading.Lock()
+    local = threading.local()
+
+
+def enable(trace_path=None):
+    _State.enabled = True
+    if trace_path:
+        _State.trace_path = trace_path
+
+
+def disable():
+    _State.enabled = False
+
+
+def is_enabled():
+    return _State.enabled
+
+
+def _read_io():
+    """Bytes read/written by this process through syscalls, where the OS exposes it."""
+    try:
+        with open("/proc/self/io", "r") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _current_rss_mb():
+    """Resident set size right now (not the lifetime high-water mark), or None."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    return None
+
+
+class _RssSampler:
+    """One background thread that tracks the peak RSS of every block in progress.
+
+    It only samples while at least one measured block is open and otherwise
+    waits on an event, so a disabled or idle pack costs nothing.
+    """
+
+    def __init__(self):
+        self.active = []
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+
+    def start(self):
+        rss = _current_rss_mb()
+        if rss is None:
+            return None
+        window = {"start": rss, "peak": rss}
+        with self.lock:
+            self.active.append(window)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="switchblade-rss", daemon=True)
+                self.thread.start()
+            self.wake.set()
+        return window
+
+    def stop(self, window):
+        if window is None:
+            return None, None
+        rss = _current_rss_mb()
+        with self.lock:
+            self.active.remove(window)
+            if rss is not None:
+                window["peak"] = max(window["peak"], rss)
+        return window["start"], window["peak"]
+
+    def _run(self):
+        while True:
+            self.wake.wait()
+            rss = _current_rss_mb()
+            with self.lock:
+                if not self.active:
+                    self.wake.clear()
+                    continue
+                if rss is not None:
+                    for window in self.active:
+                        window["peak"] = max(window["peak"], rss)
+            time.sleep(RSS_SAMPLE_INTERVAL)
+
+
+_RSS_SAMPLER = _RssSampler()
+
+
+def _stack():
+    stack = getattr(_State.local, "stack", None)
+    if stack is None:
+        stack = _State.local.stack = []
+    return stack
+
+
+@contextlib.contextmanager
+def _measure(name, category):
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    stack.append(name)
+    read_start, write_start = _read_io()
+    rss_window = _RSS_SAMPLER.start()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        read_end, write_end = _read_io()
+        rss_start, rss_peak = _RSS_SAMPLER.stop(rss_window)
+        stack.pop()
+        record = {
+            "name": name,
+            "kind": category,
+            "parent": parent,
+            "wall_ms": wall * 1000,
+            "cpu_ms": cpu * 1000,
+            "read_bytes": read_end - read_start if read_start is not None else None,
+            "write_bytes": write_end - write_start if write_start is not None else None,
+            "rss_start_mb": rss_start,
+            "peak_rss_mb": rss_peak,
+            "peak_rss_growth_mb": rss_peak - rss_start if rss_start is not None else None,
+        }
+        _emit(record, wall_start, wall)
+
+
+def _emit(record, wall_start, wall):
+    label = f"{record['parent']}/{record['name']}" if record["parent"] else record["name"]
+    io = ""
+    if record["read_bytes"] is not None:
+        io = f" read={record['read_bytes'] / 1024 ** 2:.1f}MB write={record['write_bytes'] / 1024 ** 2:.1f}MB"
+    rss = ""
+    if record["peak_rss_mb"] is not None:
+        rss = f" peak_rss={record['peak_rss_mb']:.0f}MB (+{record['peak_rss_growth_mb']:.0f}MB)"
+    logger.info(
+        f"[{record['kind']}] {label}: wall={record['wall_ms']:.1f}ms cpu={record['cpu_ms']:.1f}ms{io}{rss}",
+        extra={"switchblade": record},
+    )
+    if _State.trace_path:
+        event = {
+            "name": record["name"],
+            "cat": record["kind"],
+            "ph": "X",
+            "ts": wall_start * 1e6,
+            "dur": wall * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {k: v for k, v in record.items() if k not in ("name", "kind")},
+        }
+        with _State.lock:
+            _State.events.append(event)
+
+
+def instrument_node(name=None):
+    """Decorator recording one measurement per node execution."""
+    def decorator(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _State.enabled:
+                return fn(*args, **kwargs)
+            with _measure(label, "node"):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def phase(name):
+    """Context manager measuring one phase (convert, analyse, write, ...) of the current node."""
+    if not _State.enabled:
+        return _NULL_CONTEXT
+    return _measure(name, "phase")
+
+
+def export_trace(path=None):
+    """Write collected events as a Chrome trace JSON file."""
+    path = path or _State.trace_path
+    if not path:
+        return None
+    with _State.lock:
+        events = list(_State.events)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return path
+
+
+if os.environ.get("SWITCHBLADE_INSTRUMENT", "").lower() in ("1", "true", "yes") or os.environ.get("SWITCHBLADE_TRACE"):
+    enable(os.environ.get("SWITCHBLADE_TRACE") or None)
+
+atexit.register(lambda: _State.events and export_trace())
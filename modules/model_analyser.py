@@ -1,6 +1,7 @@
 import torch
 import json
 from collections import defaultdict
+from instrumentation import instrument_node, phase
 
 class ModelAnalyserNode:
     @classmethod
@@ -15,27 +16,29 @@ class ModelAnalyserNode:
     FUNCTION = "analyse_model"
     CATEGORY = "MilitantAI/Switchblade/Model Merging"
 
+    @instrument_node("ModelAnalyserNode")
     def analyse_model(self, model):
         model_state_dict = model.model.state_dict()
         analysis = {}
 
-        # Model Structure Analysis
-        analysis["structure"] = self.analysis_structure(model_state_dict)
+        with phase("analyse"):
+            # Model Structure Analysis
+            analysis["structure"] = self.analysis_structure(model_state_dict)
 
-        # Model Size Analysis
-        analysis["size_info"] = self.analysis_size(model_state_dict)
+            # Model Size Analysis
+            analysis["size_info"] = self.analysis_size(model_state_dict)
 
-        # Block Analysis
-        analysis["block_info"] = self.analysis_blocks(model_state_dict)
+            # Block Analysis
+            analysis["block_info"] = self.analysis_blocks(model_state_dict)
 
-        # Data Type Analysis
-        analysis["dtype_info"] = self.analysis_dtypes(model_state_dict)
+            # Data Type Analysis
+            analysis["dtype_info"] = self.analysis_dtypes(model_state_dict)
 
-        # Additional Information
-        analysis["additional_info"] = {
-            "total_tensors": len(model_state_dict),
-            "total_size_gb": sum(t.numel() * t.element_size() for t in model_state_dict.values()) / (1024**3)
-        }
+            # Additional Information
+            analysis["additional_info"] = {
+                "total_tensors": len(model_state_dict),
+                "total_size_gb": sum(t.numel() * t.element_size() for t in model_state_dict.values()) / (1024**3)
+            }
 
         return (json.dumps(analysis, indent=2),)
 
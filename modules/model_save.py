@@ -3,6 +3,7 @@ from safetensors.torch import save_file
 import os
 import json
 import folder_paths
+from instrumentation import instrument_node, phase
 
 class ModelSave_v2:
     def __init__(self):
@@ -23,27 +24,29 @@ class ModelSave_v2:
     OUTPUT_NODE = True
     CATEGORY = "MilitantAI/Switchblade/Model Merging"
 
+    @instrument_node("ModelSave_v2")
     def save_flux_model(self, model, filename_prefix, output_format):
         state_dict = model.model.state_dict()
         flux_state_dict = {}
         metadata = {"format": "flux", "model_type": "FLUX", "dtype": output_format}
 
-        print(f"Original state_dict keys: {state_dict.keys()}")
-        print(f"Original state_dict size: {self.get_state_dict_size(state_dict):.2f} GB")
+        # Key counts only: printing every key of a 1,000+ tensor model is a cost of its own
+        print(f"Original state_dict: {len(state_dict)} tensors, {self.get_state_dict_size(state_dict):.2f} GB")
 
-        for key, value in state_dict.items():
-            if key.startswith('diffusion_model.'):
-                new_key = key.replace('diffusion_model.', '', 1)
-                flux_state_dict[new_key] = self.convert_tensor(value, output_format)
-            else:
-                flux_state_dict[key] = self.convert_tensor(value, output_format)
+        with phase("convert"):
+            for key, value in state_dict.items():
+                if key.startswith('diffusion_model.'):
+                    new_key = key.replace('diffusion_model.', '', 1)
+                    flux_state_dict[new_key] = self.convert_tensor(value, output_format)
+                else:
+                    flux_state_dict[key] = self.convert_tensor(value, output_format)
 
-        print(f"Filtered flux_state_dict keys: {flux_state_dict.keys()}")
-        print(f"Filtered flux_state_dict size: {self.get_state_dict_size(flux_state_dict):.2f} GB")
+        print(f"Filtered flux_state_dict: {len(flux_state_dict)} tensors, {self.get_state_dict_size(flux_state_dict):.2f} GB")
 
         filename = f"{filename_prefix}.safetensors"
         output_path = os.path.join(self.output_dir, filename)
-        save_file(flux_state_dict, output_path, metadata=metadata)
+        with phase("write"):
+            save_file(flux_state_dict, output_path, metadata=metadata)
         
         file_size = os.path.getsize(output_path)
         
@@ -51,7 +54,8 @@ class ModelSave_v2:
         print(f"Total tensors saved: {len(flux_state_dict)}")
         print(f"Saved file size: {file_size / (1024**3):.2f} GB")
 
-        self.save_tensor_info(flux_state_dict, output_path)
+        with phase("write_info"):
+            self.save_tensor_info(flux_state_dict, output_path)
 
         return {}
 
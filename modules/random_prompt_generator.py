@@ -1,17 +1,21 @@
 import os
 import sys
 import random
+from instrumentation import instrument_node
 
 class DictionaryPromptGenerator:
-    @classmethod
-    def INPUT_TYPES(cls):
+    @staticmethod
+    def get_dictionaries_folder():
         # Get the path of the current script
         script_path = os.path.abspath(__file__)
         # Navigate up the directory tree to reach the "ComfyUI" folder
         comfyui_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(script_path))))
         # Construct the path to the "Dictionaries" folder
-        dictionaries_folder = os.path.join(comfyui_path, "input", "Dictionaries")
-        files = cls.get_all_txt_files(dictionaries_folder)
+        return os.path.join(comfyui_path, "input", "Dictionaries")
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        files = cls.get_all_txt_files(cls.get_dictionaries_folder())
         return {
             "required": {
                 "dict1_file": (["none"] + files,),
@@ -46,13 +50,14 @@ class DictionaryPromptGenerator:
     FUNCTION = "generate"
     CATEGORY = "MilitantAI/Switchblade/Text Processing"
 
+    @instrument_node("DictionaryPromptGenerator")
     def generate(self, dict1_file, dict2_file, dict3_file, dict4_file,
                  enable_dict1, enable_dict2, enable_dict3, enable_dict4,
                  dict1_delimiter, dict2_delimiter, dict3_delimiter, dict4_delimiter,
                  output_delimiter, seed):
         random.seed(seed)
        
-        dictionaries_folder = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), "input", "Dictionaries")
+        dictionaries_folder = self.get_dictionaries_folder()
        
         def load_and_process_dict(file, delimiter, enabled):
             if not enabled or file == "none":
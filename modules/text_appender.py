@@ -1,5 +1,70 @@
 import folder_paths
 import os
+import io
+import re
+import json
+import glob
+import gzip
+import shutil
+import time
+
+from instrumentation import instrument_node
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SEGMENT_EXTENSIONS = (".jsonl", ".jsonl.gz", ".jsonl.zst")
+
+
+def _segment_base(file_path):
+    """Strip a .jsonl suffix so segments are named <base>.<stamp>.jsonl."""
+    return file_path[:-len(".jsonl")] if file_path.endswith(".jsonl") else file_path
+
+
+def _open_segment(path):
+    """Open a (possibly compressed) JSONL segment for text reading."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("zstandard is required to read .zst segments (pip install zstandard)")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True), encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def list_jsonl_segments(file_path):
+    """Return rotated segments (oldest first) followed by the active file."""
+    base = _segment_base(file_path)
+    segments = []
+    for ext in SEGMENT_EXTENSIONS:
+        segments.extend(glob.glob(f"{glob.escape(base)}.*{ext}"))
+    pattern = re.compile(re.escape(base) + r"\.(\d{8}-\d{6}-\d{6})\.jsonl(\.gz|\.zst)?$")
+    rotated = sorted((m.group(1), p) for p in set(segments) if (m := pattern.match(p)))
+    paths = [p for _, p in rotated]
+    active = base + ".jsonl"
+    if os.path.exists(active):
+        paths.append(active)
+    return paths
+
+
+def read_jsonl_records(file_path):
+    """Lazily yield records from every segment of a JSONL output, in write order.
+
+    `file_path` may be the active .jsonl file or a single segment path.
+    """
+    if os.path.exists(file_path) and re.search(r"\.\d{8}-\d{6}-\d{6}\.jsonl(\.gz|\.zst)?$", file_path):
+        paths = [file_path]
+    else:
+        paths = list_jsonl_segments(file_path)
+    for path in paths:
+        with _open_segment(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
 
 class TextAppender:
     @classmethod
@@ -12,9 +77,15 @@ class TextAppender:
                 "text3": ("STRING", {"default": ""}),
                 "text4": ("STRING", {"default": ""}),
                 "text5": ("STRING", {"default": ""}),
-                "input_delimiter": ("STRING", {"default": "\\n"}),  
-                "output_delimiter": ("STRING", {"default": "\\n"}),  
+                "input_delimiter": ("STRING", {"default": "\\n"}),
+                "output_delimiter": ("STRING", {"default": "\\n"}),
                 "output_file": ("STRING", {"default": "none"}),
+                "output_mode": (["text", "jsonl"], {"default": "text"}),
+                "rotate_max_mb": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 100000.0, "step": 1.0}),
+                "rotate_max_minutes": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 525600.0, "step": 1.0}),
+                "compression": (["none", "gzip", "zstd"], {"default": "none"}),
+                "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),
+                "metadata": ("STRING", {"default": "", "multiline": True}),
             }
         }
 
@@ -23,20 +94,36 @@ class TextAppender:
     OUTPUT_NODE = True
     CATEGORY = "MilitantAI/Switchblade/Text Processing"
 
-    def append_text(self, text1="", text2="", text3="", text4="", text5="", input_delimiter="", output_delimiter="", output_file="none"):
+    @instrument_node("TextAppender")
+    def append_text(self, text1="", text2="", text3="", text4="", text5="", input_delimiter="", output_delimiter="", output_file="none",
+                    output_mode="text", rotate_max_mb=0.0, rotate_max_minutes=0.0, compression="none", seed=0, metadata=""):
         # Collect non-empty texts
         texts = [text for text in [text1, text2, text3, text4, text5] if text]
         if not texts:
             print("No text to append.")
             return ("",)
-        
+
         # If the delimiters are specified as \n, convert to actual newline, otherwise leave empty delimiter as is
         input_delimiter = input_delimiter.replace("\\n", "\n") if input_delimiter else ""
         output_delimiter = output_delimiter.replace("\\n", "\n") if output_delimiter else ""
-        
+
         # Join texts with input_delimiter
         result = input_delimiter.join(texts)
-        
+
+        if output_mode == "jsonl":
+            if output_file != "none":
+                record = {
+                    "timestamp": time.time(),
+                    "text": result,
+                    "texts": {f"text{i}": t for i, t in enumerate([text1, text2, text3, text4, text5], 1) if t},
+                    "seed": seed,
+                    "metadata": self.parse_metadata(metadata),
+                }
+                self.write_jsonl_record(output_file, record, rotate_max_mb, rotate_max_minutes, compression)
+            else:
+                print("No output file specified. Text only returned as output.")
+            return (result,)
+
         # Append output_delimiter at the end only if specified
         if output_delimiter:
             result += output_delimiter
@@ -45,19 +132,19 @@ class TextAppender:
             try:
                 # Get output directory
                 output_dir = folder_paths.get_output_directory()
-                
+
                 # Ensure output directory exists, create if not
                 if not os.path.exists(output_dir):
                     os.makedirs(output_dir)
 
                 # Create full file path
                 file_path = os.path.join(output_dir, output_file)
-                
+
                 # Open the file in append mode, create it if it doesn't exist
                 with open(file_path, 'a', encoding='utf-8') as f:
                     f.write(result)
                 print(f"Successfully appended text to {file_path}")
-            
+
             except Exception as e:
                 print(f"Error appending to file {file_path}: {str(e)}")
         else:
@@ -65,6 +152,95 @@ class TextAppender:
 
         return (result,)
 
+    def parse_metadata(self, metadata):
+        """Metadata is stored as JSON when it parses, otherwise as the raw string."""
+        if not metadata:
+            return {}
+        try:
+            return json.loads(metadata)
+        except json.JSONDecodeError:
+            return metadata
+
+    def write_jsonl_record(self, output_file, record, rotate_max_mb, rotate_max_minutes, compression):
+        """Append one record to the active segment, rotating it first if it is full or too old."""
+        file_path = None
+        try:
+            output_dir = folder_paths.get_output_directory()
+            if not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+
+            file_path = _segment_base(os.path.join(output_dir, output_file)) + ".jsonl"
+            if self.should_rotate(file_path, rotate_max_mb, rotate_max_minutes):
+                self.rotate_segment(file_path, compression)
+
+            with open(file_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            print(f"Successfully appended record to {file_path}")
+
+        except Exception as e:
+            print(f"Error appending to file {file_path}: {str(e)}")
+
+    def should_rotate(self, file_path, rotate_max_mb, rotate_max_minutes):
+        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+            return False
+        if rotate_max_mb > 0 and os.path.getsize(file_path) >= rotate_max_mb * 1024 * 1024:
+            return True
+        if rotate_max_minutes > 0:
+            # The segment's age is taken from its first record, so it survives restarts
+            with open(file_path, 'r', encoding='utf-8') as f:
+                first = f.readline()
+            try:
+                started = json.loads(first)["timestamp"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                started = os.path.getmtime(file_path)
+            if time.time() - started >= rotate_max_minutes * 60:
+                return True
+        return False
+
+    def rotate_segment(self, file_path, compression):
+        """Rename the active segment and optionally compress it in a streaming fashion.
+
+        Returns the path of the rotated segment; a failed compression leaves it uncompressed.
+        """
+        base = _segment_base(file_path)
+        now = time.time()
+        # UTC stamps sort in write order even across DST changes
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(now)) + f"-{int(now % 1 * 1e6):06d}"
+        segment_path = f"{base}.{stamp}.jsonl"
+        os.replace(file_path, segment_path)
+
+        if compression == "zstd" and zstandard is None:
+            print("zstandard is not installed; leaving rotated segment uncompressed. (pip install zstandard)")
+            compression = "none"
+
+        if compression not in ("gzip", "zstd"):
+            print(f"Rotated segment to {segment_path}")
+            return segment_path
+
+        compressed_path = segment_path + (".gz" if compression == "gzip" else ".zst")
+        # Compress to a temporary name first so a crash or full disk never leaves a
+        # truncated archive next to the intact segment
+        tmp_path = compressed_path + ".tmp"
+        try:
+            if compression == "gzip":
+                with open(segment_path, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+            else:
+                with open(segment_path, 'rb') as src, open(tmp_path, 'wb') as raw:
+                    with zstandard.ZstdCompressor().stream_writer(raw) as dst:
+                        shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, compressed_path)
+        except Exception as e:
+            # The segment is already rotated out; keep it uncompressed so the record still gets written
+            print(f"Error compressing segment {segment_path}, leaving it uncompressed: {str(e)}")
+            return segment_path
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        os.remove(segment_path)
+        print(f"Rotated and compressed segment to {compressed_path}")
+        return compressed_path
 
 NODE_CLASS_MAPPINGS = {
     "TextAppender_v2": TextAppender